@@ -0,0 +1,107 @@
+"""Dataset endpoints for HR Analytics API.
+
+Operational endpoints about the cleaned dataset itself rather than HR reports.
+"""
+
+import io
+from typing import (
+    Any,
+    Dict,
+)
+
+import pandas as pd
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    HTTPException,
+    Request,
+)
+from fastapi.concurrency import run_in_threadpool
+
+from src.hr_analysis.api.materialize import (
+    materialized_summary,
+    materializer,
+)
+from src.hr_analysis.api.utils.push import push_hub
+from src.hr_analysis.api.utils.single_flight import report_flights
+from src.hr_analysis.data_cleaner import (
+    COMPACTION_MIN_SEGMENTS,
+    compact_delta_log,
+    get_cleaned_df,
+    get_dataset_version,
+    ingest_batch,
+    pending_segment_count,
+    read_cleaned_store,
+)
+from src.hr_analysis.memory_compaction import memory_report
+
+router = APIRouter()
+
+
+@router.get("/dataset/memory", response_model=Dict[str, Any])
+def dataset_memory_report() -> Dict[str, Any]:
+    """
+    Per-column memory of the cleaned dataset as read from disk versus the
+    compacted DataFrame held in memory by get_cleaned_df().
+    """
+    report = memory_report(read_cleaned_store(), get_cleaned_df())
+    report["dataset_version"] = get_dataset_version()
+    return report
+
+
+@router.get("/dataset/coalescing", response_model=Dict[str, int])
+def request_coalescing_stats() -> Dict[str, int]:
+    """
+    Single-flight counters for report and dashboard requests: computations run,
+    requests that waited on an identical one instead, and current in-flight load.
+    """
+    return report_flights.stats()
+
+
+@router.get("/dataset/materialized", response_model=Dict[str, Any])
+def materialized_reports_stats() -> Dict[str, Any]:
+    """
+    Precomputed standard report windows stored for the current dataset version,
+    and how many report requests were served from them versus computed.
+    """
+    return materialized_summary()
+
+
+@router.post("/dataset/ingest", response_model=Dict[str, Any])
+async def ingest_attendance_batch(request: Request, background_tasks: BackgroundTasks) -> Dict[str, Any]:
+    """
+    Ingests one attendance CSV batch sent as the raw request body (text/csv).
+    The batch is cleaned like files in unclean_data, appended to the delta log
+    and visible to reports immediately; rows replace existing ones for the same
+    employee and day. Compaction into cleaned.csv is scheduled in the background
+    once enough segments are pending.
+    """
+    body = await request.body()
+    if not body.strip():
+        raise HTTPException(status_code=400, detail="Request body must be a non-empty CSV file")
+    try:
+        raw_df = pd.read_csv(io.BytesIO(body), low_memory=False)
+        segment = await run_in_threadpool(ingest_batch, raw_df)
+    except (ValueError, pd.errors.ParserError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    push_hub.nudge()
+    materializer.nudge()
+    pending = pending_segment_count()
+    if pending >= COMPACTION_MIN_SEGMENTS:
+        background_tasks.add_task(compact_delta_log)
+        background_tasks.add_task(materializer.nudge)
+    return {
+        "rows": len(raw_df),
+        "segment": segment.name,
+        "pending_segments": pending,
+        "dataset_version": get_dataset_version(),
+    }
+
+
+@router.post("/dataset/compact", response_model=Dict[str, Any])
+def compact_dataset() -> Dict[str, Any]:
+    """Merges all pending delta segments into cleaned.csv now."""
+    merged = compact_delta_log()
+    push_hub.nudge()
+    materializer.nudge()
+    return {"merged_segments": merged, "dataset_version": get_dataset_version()}
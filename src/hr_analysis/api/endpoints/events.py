@@ -0,0 +1,88 @@
+"""Server-sent events endpoint for HR Analytics API.
+
+Dashboards subscribe to a report or dashboard request and receive its result
+again only when the cleaned dataset changes, instead of polling. The stream is
+served outside the /reports and /dashboard prefixes, so the ETag/gzip caching
+middleware (which buffers whole responses) never wraps it.
+"""
+
+import asyncio
+from typing import (
+    Dict,
+    Optional,
+)
+from urllib.parse import urlencode
+
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+)
+from fastapi.responses import StreamingResponse
+from starlette.routing import Match
+
+from src.hr_analysis.api.utils.caching import CACHED_PATH_PREFIXES
+from src.hr_analysis.api.utils.push import (
+    KEEPALIVE_SECONDS,
+    push_hub,
+)
+
+router = APIRouter()
+
+# Query parameters of /events itself; everything else belongs to the subscribed request
+EVENTS_PARAMS = ("path", "payload")
+
+
+def _is_report_route(request: Request, path: str) -> bool:
+    scope = {"type": "http", "path": path, "method": "GET"}
+    return path.startswith(CACHED_PATH_PREFIXES) and any(
+        route.matches(scope)[0] == Match.FULL for route in request.app.routes
+    )
+
+
+@router.get("/events")
+async def subscribe_to_updates(
+    request: Request,
+    path: str = Query(..., description="Report or dashboard path to follow, e.g. /reports/department-overtime"),
+    payload: str = Query(
+        "full", pattern="^(full|version)$", description="'full' pushes results, 'version' only version changes"
+    ),
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """
+    Streams `update` events (text/event-stream) for one report request. All other
+    query parameters are passed to the report. The first event carries the
+    current result; later ones are sent only when the dataset version changes.
+    Every event id is the dataset version, so a reconnecting client that sends
+    Last-Event-ID is not sent a result it already has.
+    """
+    if not _is_report_route(request, path):
+        raise HTTPException(status_code=404, detail=f"No report or dashboard at {path}")
+    params = request.query_params.multi_items()
+    query = urlencode(sorted((key, value) for key, value in params if key not in EVENTS_PARAMS and value != ""))
+    subscription, subscriber, first_event = await push_hub.subscribe(
+        request.app, path, query, payload == "full", last_event_id
+    )
+
+    async def stream():
+        try:
+            if first_event is not None:
+                yield first_event
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            push_hub.unsubscribe(subscription, subscriber)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/events/stats", response_model=Dict[str, int])
+def push_stats() -> Dict[str, int]:
+    """Open subscriptions and subscribers, reports computed for them and events delivered."""
+    return push_hub.stats()
@@ -25,8 +25,26 @@ from fastapi import (
     Query,
 )
 
+from src.hr_analysis.calendar_dim import (
+    MISSING_KEY,
+    period_labels,
+)
 # Use project-level cleaned DataFrame loader
-from src.hr_analysis.data_cleaner import get_cleaned_df
+from src.hr_analysis.data_cleaner import (
+    get_calendar,
+    get_cleaned_df,
+)
+from src.hr_analysis.overtime_policy import (
+    CONSECUTIVE_DAYS,
+    ROLLING_DAYS,
+    ROLLING_HOURS,
+    PolicyRule,
+    evaluate_policies,
+)
+from src.hr_analysis.sql_backend import (
+    overtime_totals,
+    sql_backend_enabled,
+)
 
 
 
@@ -76,33 +94,39 @@ def overtime_month_comparison(
     Compares overtime hours across months for departments or employees.
     Filters: department, employee_id, start_date, end_date.
     """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Filter by department
-    if department and "department" in df.columns:
-        df = df[df["department"].str.lower() == department.lower()]
-    # Filter by employee_id
-    if employee_id:
-        df = df[df["employee_id"] == employee_id]
-    # Only consider rows with overtime
-    if "total_ot" in df.columns:
-        df = df[df["total_ot"].fillna(0) > 0]
-    # Add month column
-    df["month"] = df["date"].dt.strftime("%Y-%m")
-    # Group by month, sum total_ot
-    if "total_ot" in df.columns:
-        summary = (
-            df.groupby(["month"])["total_ot"].sum().reset_index()
+    df = get_cleaned_df(start_date, end_date)
+    if sql_backend_enabled():
+        summary = overtime_totals(
+            df, ["month_key"], start_date, end_date, department, employee_id,
+            overtime_only=True, period_key="month_key",
         )
     else:
-        summary = df.groupby(["month"]).size().reset_index(name="total_overtime_hours")
+        # Standardize date column
+        if "date" in df.columns:
+            df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+        # Filter by date range
+        if start_date:
+            df = df[df["date"] >= pd.to_datetime(start_date)]
+        if end_date:
+            df = df[df["date"] <= pd.to_datetime(end_date)]
+        # Filter by department
+        if department and "department" in df.columns:
+            df = df[df["department"].str.lower() == department.lower()]
+        # Filter by employee_id
+        if employee_id:
+            df = df[df["employee_id"] == employee_id]
+        # Only consider rows with overtime
+        if "total_ot" in df.columns:
+            df = df[df["total_ot"].fillna(0) > 0]
+        # Group by integer month key, label only the aggregated rows
+        df = df[df["month_key"] != MISSING_KEY]
+        if "total_ot" in df.columns:
+            summary = (
+                df.groupby(["month_key"], observed=True)["total_ot"].sum().reset_index()
+            )
+        else:
+            summary = df.groupby(["month_key"], observed=True).size().reset_index(name="total_overtime_hours")
+    summary["month"] = period_labels(get_calendar(), "month_key").reindex(summary["month_key"]).to_numpy()
     # Build response
     result = []
     for _, row in summary.iterrows():
@@ -136,9 +160,10 @@ def all_attendance_report() -> Dict[str, List[Dict[str, Any]]]:
     """
     df = get_cleaned_df()
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+        # assign() keeps the cached DataFrame's datetime column untouched
+        df = df.assign(date=pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d"))
     columns = ["employee_id", "date", "department", "day_type", "exception"]
-    attendance = df[columns].fillna("").to_dict(orient="records")
+    attendance = df[columns].astype(object).fillna("").to_dict(orient="records")
     return {"attendance": attendance}
 
 ## Report 1: Employee Attendance Report (Filtered) — see report_details.md
@@ -172,11 +197,12 @@ def employee_attendance_report(
         ]
     }
     """
-    df = get_cleaned_df()
+    df = get_cleaned_df(start_date, end_date)
 
     # Standardize date column
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+        # assign() keeps the cached DataFrame's datetime column untouched
+        df = df.assign(date=pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d"))
 
     # Apply filters
     if employee_id:
@@ -190,7 +216,7 @@ def employee_attendance_report(
 
     # Select relevant columns for attendance report
     columns = ["employee_id", "date", "department", "day_type", "exception"]
-    attendance = df[columns].fillna("").to_dict(orient="records")
+    attendance = df[columns].astype(object).fillna("").to_dict(orient="records")
 
     return {"attendance": attendance}
 
@@ -208,37 +234,44 @@ def overtime_trends(
     Shows overtime hours trends (daily, weekly, monthly) for employees or departments.
     Filters: department, employee_id, time granularity, date range.
     """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Filter by department
-    if department and "department" in df.columns:
-        df = df[df["department"].str.lower() == department.lower()]
-    # Filter by employee_id
-    if employee_id:
-        df = df[df["employee_id"] == employee_id]
-    # Only consider rows with overtime
-    if "total_ot" in df.columns:
-        df = df[df["total_ot"].fillna(0) > 0]
-    # Group by granularity
+    df = get_cleaned_df(start_date, end_date)
+    # Group by the integer period key for the granularity, label only the aggregated rows
     if granularity == "monthly":
-        df["period"] = df["date"].dt.strftime("%Y-%m")
+        period_key = "month_key"
     elif granularity == "weekly":
-        df["period"] = df["date"].dt.strftime("%Y-W%V")
+        period_key = "iso_week_key"
     else:
-        df["period"] = df["date"].dt.strftime("%Y-%m-%d")
-    group_cols = ["period"]
+        period_key = "day_key"
+    group_cols = [period_key]
     if department:
         group_cols.append("department")
     if employee_id:
         group_cols.append("employee_id")
-    summary = df.groupby(group_cols)["total_ot"].sum().reset_index()
+    if sql_backend_enabled():
+        summary = overtime_totals(
+            df, group_cols, start_date, end_date, department, employee_id, overtime_only=True, period_key=period_key
+        )
+    else:
+        # Standardize date column
+        if "date" in df.columns:
+            df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+        # Filter by date range
+        if start_date:
+            df = df[df["date"] >= pd.to_datetime(start_date)]
+        if end_date:
+            df = df[df["date"] <= pd.to_datetime(end_date)]
+        # Filter by department
+        if department and "department" in df.columns:
+            df = df[df["department"].str.lower() == department.lower()]
+        # Filter by employee_id
+        if employee_id:
+            df = df[df["employee_id"] == employee_id]
+        # Only consider rows with overtime
+        if "total_ot" in df.columns:
+            df = df[df["total_ot"].fillna(0) > 0]
+        df = df[df[period_key] != MISSING_KEY]
+        summary = df.groupby(group_cols, observed=True)["total_ot"].sum().reset_index()
+    summary["period"] = period_labels(get_calendar(), period_key).reindex(summary[period_key]).to_numpy()
     # Build response
     result = []
     for _, row in summary.iterrows():
@@ -266,28 +299,33 @@ def top_overtime_employees(
     Lists employees with the highest overtime hours in a given period.
     Filters: department, date range, top N.
     """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Filter by department
-    if department and "department" in df.columns:
-        df = df[df["department"].str.lower() == department.lower()]
-    # Only consider rows with overtime
-    if "total_ot" in df.columns:
-        df = df[df["total_ot"].fillna(0) > 0]
-    # Group by employee, sum total_ot
-    if "total_ot" in df.columns:
-        summary = (
-            df.groupby(["employee_id", "department"])["total_ot"].sum().reset_index()
+    df = get_cleaned_df(start_date, end_date)
+    if sql_backend_enabled():
+        summary = overtime_totals(
+            df, ["employee_id", "department"], start_date, end_date, department=department, overtime_only=True
         )
     else:
-        summary = df.groupby(["employee_id", "department"]).size().reset_index(name="total_overtime_hours")
+        # Standardize date column
+        if "date" in df.columns:
+            df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+        # Filter by date range
+        if start_date:
+            df = df[df["date"] >= pd.to_datetime(start_date)]
+        if end_date:
+            df = df[df["date"] <= pd.to_datetime(end_date)]
+        # Filter by department
+        if department and "department" in df.columns:
+            df = df[df["department"].str.lower() == department.lower()]
+        # Only consider rows with overtime
+        if "total_ot" in df.columns:
+            df = df[df["total_ot"].fillna(0) > 0]
+        # Group by employee, sum total_ot
+        if "total_ot" in df.columns:
+            summary = (
+                df.groupby(["employee_id", "department"], observed=True)["total_ot"].sum().reset_index()
+            )
+        else:
+            summary = df.groupby(["employee_id", "department"], observed=True).size().reset_index(name="total_overtime_hours")
     # Sort and limit to top N
     summary = summary.sort_values(by="total_ot" if "total_ot" in summary.columns else "total_overtime_hours", ascending=False)
     summary = summary.head(top_n)
@@ -307,16 +345,21 @@ def overtime_exceptions(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     department: Optional[str] = Query(None, description="Filter by department"),
-    threshold_hours: Optional[float] = Query(None, description="Threshold hours for exception")
+    threshold_hours: Optional[float] = Query(None, description="Threshold hours for exception"),
+    rolling_hours_limit: Optional[float] = Query(None, description="Max overtime hours in any rolling window"),
+    rolling_hours_window: int = Query(7, ge=1, description="Window in days for rolling_hours_limit"),
+    overtime_days_limit: Optional[int] = Query(None, description="Max overtime days in any rolling window"),
+    overtime_days_window: int = Query(30, ge=1, description="Window in days for overtime_days_limit"),
+    max_consecutive_days: Optional[int] = Query(None, ge=1, description="Flag overtime streaks of this many days or more"),
 ) -> Dict[str, Any]:
     """
     Identifies overtime entries that exceed policy limits or require approval.
     Filters: department, date range, threshold hours.
+    Rolling policies (hours or overtime days in a window, consecutive-day streaks)
+    are evaluated together and returned as merged violation windows.
     """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = get_cleaned_df(start_date, end_date)
+    df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
     # Filter by date range
     if start_date:
         df = df[df["date"] >= pd.to_datetime(start_date)]
@@ -325,122 +368,40 @@ def overtime_exceptions(
     # Filter by department
     if department and "department" in df.columns:
         df = df[df["department"].str.lower() == department.lower()]
+
+    rules = []
+    if rolling_hours_limit is not None:
+        rules.append(PolicyRule(ROLLING_HOURS, rolling_hours_limit, rolling_hours_window))
+    if overtime_days_limit is not None:
+        rules.append(PolicyRule(ROLLING_DAYS, overtime_days_limit, overtime_days_window))
+    if max_consecutive_days is not None:
+        rules.append(PolicyRule(CONSECUTIVE_DAYS, max_consecutive_days))
+    violations = evaluate_policies(df, rules)
+
     # Only consider rows with overtime
-    if "total_ot" in df.columns:
-        df = df[df["total_ot"].fillna(0) > 0]
+    if "total_ot" not in df.columns:
+        return {"overtime_exceptions": [], "policy_violations": violations}
+    df = df[df["total_ot"].fillna(0) > 0]
     # Apply threshold filter
-    if threshold_hours is not None and "total_ot" in df.columns:
+    if threshold_hours is not None:
         df = df[df["total_ot"] > threshold_hours]
     # Build response
-    result = []
-    for _, row in df.iterrows():
-        result.append({
-            "employee_id": row["employee_id"],
-            "department": row["department"] if "department" in row else None,
-            "date": row["date"].strftime("%Y-%m-%d") if hasattr(row["date"], "strftime") else str(row["date"]),
-            "overtime_hours": float(row["total_ot"]) if "total_ot" in row else None,
-            "exception_reason": "Exceeded daily limit" if threshold_hours is not None and row["total_ot"] > threshold_hours else "Requires approval"
-        })
-    return {"overtime_exceptions": result}
-def top_overtime_employees(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    department: Optional[str] = Query(None, description="Filter by department"),
-    top_n: Optional[int] = Query(10, description="Limit results to top N records")
-) -> Dict[str, Any]:
-    """
-    Lists employees with the highest overtime hours in a given period.
-    Filters: department, date range, top N.
-    """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Filter by department
-    if department and "department" in df.columns:
-        df = df[df["department"].str.lower() == department.lower()]
-    # Only consider rows with overtime
-    if "total_ot" in df.columns:
-        df = df[df["total_ot"].fillna(0) > 0]
-    # Group by employee, sum total_ot
-    if "total_ot" in df.columns:
-        summary = (
-            df.groupby(["employee_id", "department"])["total_ot"].sum().reset_index()
-        )
-    else:
-        summary = df.groupby(["employee_id", "department"]).size().reset_index(name="total_overtime_hours")
-    # Sort and limit to top N
-    summary = summary.sort_values(by="total_ot" if "total_ot" in summary.columns else "total_overtime_hours", ascending=False)
-    summary = summary.head(top_n)
-    # Build response
-    result = []
-    for _, row in summary.iterrows():
-        result.append({
-            "employee_id": row["employee_id"],
-            "department": row["department"],
-            "total_overtime_hours": float(row["total_ot"]) if "total_ot" in row else int(row["total_overtime_hours"])
-        })
-    return {"top_overtime_employees": result}
-def overtime_trends(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    department: Optional[str] = Query(None, description="Filter by department"),
-    employee_id: Optional[str] = Query(None, description="Filter by employee ID"),
-    granularity: Optional[str] = Query("daily", description="Time granularity: daily, weekly, monthly")
-) -> Dict[str, Any]:
-    """
-    Shows overtime hours trends (daily, weekly, monthly) for employees or departments.
-    Filters: department, employee_id, time granularity, date range.
-    """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Filter by department
-    if department and "department" in df.columns:
-        df = df[df["department"].str.lower() == department.lower()]
-    # Filter by employee_id
-    if employee_id:
-        df = df[df["employee_id"] == employee_id]
-    # Only consider rows with overtime
-    if "total_ot" in df.columns:
-        df = df[df["total_ot"].fillna(0) > 0]
-    # Group by granularity
-    if granularity == "monthly":
-        df["period"] = df["date"].dt.strftime("%Y-%m")
-    elif granularity == "weekly":
-        df["period"] = df["date"].dt.strftime("%Y-W%V")
-    else:
-        df["period"] = df["date"].dt.strftime("%Y-%m-%d")
-    group_cols = ["period"]
-    if department:
-        group_cols.append("department")
-    if employee_id:
-        group_cols.append("employee_id")
-    summary = df.groupby(group_cols)["total_ot"].sum().reset_index()
-    # Build response
-    result = []
-    for _, row in summary.iterrows():
-        entry = {
-            "date": row["period"],
-            "total_overtime_hours": float(row["total_ot"])
+    departments = df["department"].astype(object) if "department" in df.columns else pd.Series(None, index=df.index)
+    dates = df["date"].dt.strftime("%Y-%m-%d").astype(object).where(df["date"].notna(), "NaT")
+    reason = "Exceeded daily limit" if threshold_hours is not None else "Requires approval"
+    result = [
+        {
+            "employee_id": employee_id,
+            "department": dept,
+            "date": date,
+            "overtime_hours": float(hours),
+            "exception_reason": reason,
         }
-        if "department" in row:
-            entry["department"] = row["department"]
-        if "employee_id" in row:
-            entry["employee_id"] = row["employee_id"]
-        result.append(entry)
-    return {"overtime_trends": result}
+        for employee_id, dept, date, hours in zip(
+            df["employee_id"].astype(object), departments, dates, df["total_ot"]
+        )
+    ]
+    return {"overtime_exceptions": result, "policy_violations": violations}
 ## Report 14: Department Overtime Summary — see report_details.md
 @router.get("/reports/department-overtime", response_model=Dict[str, Any])
 def department_overtime(
@@ -451,22 +412,25 @@ def department_overtime(
     Aggregates total overtime hours by department for a selected period.
     Filters: date range.
     """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Group by department, sum total_ot
-    if "total_ot" in df.columns:
-        summary = (
-            df.groupby(["department"])["total_ot"].sum().reset_index()
-        )
+    df = get_cleaned_df(start_date, end_date)
+    if sql_backend_enabled():
+        summary = overtime_totals(df, ["department"], start_date, end_date)
     else:
-        summary = df.groupby(["department"]).size().reset_index(name="total_overtime_hours")
+        # Standardize date column
+        if "date" in df.columns:
+            df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+        # Filter by date range
+        if start_date:
+            df = df[df["date"] >= pd.to_datetime(start_date)]
+        if end_date:
+            df = df[df["date"] <= pd.to_datetime(end_date)]
+        # Group by department, sum total_ot
+        if "total_ot" in df.columns:
+            summary = (
+                df.groupby(["department"], observed=True)["total_ot"].sum().reset_index()
+            )
+        else:
+            summary = df.groupby(["department"], observed=True).size().reset_index(name="total_overtime_hours")
     # Build response
     result = []
     for _, row in summary.iterrows():
@@ -485,10 +449,10 @@ def overtime_summary(
     Summarizes total overtime hours per employee for a given period.
     Filters: department, date range.
     """
-    df = get_cleaned_df()
+    df = get_cleaned_df(start_date, end_date)
     # Standardize date column
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
     # Filter by date range
     if start_date:
         df = df[df["date"] >= pd.to_datetime(start_date)]
@@ -500,10 +464,10 @@ def overtime_summary(
     # Group by employee, sum total_ot
     if "total_ot" in df.columns:
         summary = (
-            df.groupby(["employee_id", "department"])["total_ot"].sum().reset_index()
+            df.groupby(["employee_id", "department"], observed=True)["total_ot"].sum().reset_index()
         )
     else:
-        summary = df.groupby(["employee_id", "department"]).size().reset_index(name="total_overtime_hours")
+        summary = df.groupby(["employee_id", "department"], observed=True).size().reset_index(name="total_overtime_hours")
     # Build response
     result = []
     for _, row in summary.iterrows():
@@ -532,10 +496,10 @@ def overtime_weekly_summary(
     Columns are week labels (YYYY-Www), rows are employees, each cell is count of overtime days for that employee in that week.
     """
     import numpy as np
-    df = get_cleaned_df()
+    df = get_cleaned_df(start_date, end_date)
     # Standardize date column
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
     # Filter by date range
     if start_date:
         df = df[df["date"] >= pd.to_datetime(start_date)]
@@ -550,22 +514,21 @@ def overtime_weekly_summary(
     # Only consider days with overtime (total_ot > 0)
     if "total_ot" in df.columns:
         df = df[df["total_ot"].fillna(0) > 0]
-    # Week calculation
+    # Week calculation on precomputed integer keys (see calendar_dim)
     if week_start.lower() == "monday":
         # ISO week: Monday-Sunday
-        df["week_label"] = df["date"].dt.strftime("%Y-W%V")
+        week_key = "iso_week_key"
     else:
-        # Custom week: Sunday-Saturday
-        # Shift dates so that week starts on Sunday
-        # pandas weekday: Monday=0, Sunday=6
-        df["week_start"] = df["date"] - pd.to_timedelta((df["date"].dt.weekday + 1) % 7, unit="D")
-        df["week_label"] = df["week_start"].dt.strftime("%Y-W%U")
+        # Custom week: Sunday-Saturday, keyed by the Sunday starting the week
+        week_key = "sunday_week_key"
+    df = df[df[week_key] != MISSING_KEY]
     # Group by employee and week, count overtime days
     summary = (
-        df.groupby(["employee_id", "week_label"]).size().reset_index(name="overtime_days")
+        df.groupby(["employee_id", week_key], observed=True).size().reset_index(name="overtime_days")
     )
     # Pivot to wide format: rows=employee, columns=week
-    pivot = summary.pivot(index="employee_id", columns="week_label", values="overtime_days").fillna(0).astype(int)
+    pivot = summary.pivot(index="employee_id", columns=week_key, values="overtime_days").fillna(0).astype(int)
+    pivot.columns = period_labels(get_calendar(), week_key).reindex(pivot.columns).to_numpy()
     # Build response
     result = []
     for emp_id, row in pivot.iterrows():
@@ -584,22 +547,25 @@ def overtime_department_comparison(
     Compares overtime hours across departments for a selected period.
     Filters: start_date, end_date.
     """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Group by department, sum total_ot
-    if "total_ot" in df.columns:
-        summary = (
-            df.groupby(["department"])["total_ot"].sum().reset_index()
-        )
+    df = get_cleaned_df(start_date, end_date)
+    if sql_backend_enabled():
+        summary = overtime_totals(df, ["department"], start_date, end_date)
     else:
-        summary = df.groupby(["department"]).size().reset_index(name="total_overtime_hours")
+        # Standardize date column
+        if "date" in df.columns:
+            df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+        # Filter by date range
+        if start_date:
+            df = df[df["date"] >= pd.to_datetime(start_date)]
+        if end_date:
+            df = df[df["date"] <= pd.to_datetime(end_date)]
+        # Group by department, sum total_ot
+        if "total_ot" in df.columns:
+            summary = (
+                df.groupby(["department"], observed=True)["total_ot"].sum().reset_index()
+            )
+        else:
+            summary = df.groupby(["department"], observed=True).size().reset_index(name="total_overtime_hours")
     # Build response
     result = []
     for _, row in summary.iterrows():
@@ -620,25 +586,28 @@ def overtime_employee_comparison(
     Compares overtime hours between selected employees for a given period.
     Filters: employee_ids, start_date, end_date.
     """
-    df = get_cleaned_df()
-    # Standardize date column
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Filter by date range
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
-    # Filter by employee_ids
-    if employee_ids:
-        df = df[df["employee_id"].isin(employee_ids)]
-    # Group by employee, sum total_ot
-    if "total_ot" in df.columns:
-        summary = (
-            df.groupby(["employee_id"])["total_ot"].sum().reset_index()
-        )
+    df = get_cleaned_df(start_date, end_date)
+    if sql_backend_enabled():
+        summary = overtime_totals(df, ["employee_id"], start_date, end_date, employee_ids=employee_ids)
     else:
-        summary = df.groupby(["employee_id"]).size().reset_index(name="total_overtime_hours")
+        # Standardize date column
+        if "date" in df.columns:
+            df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+        # Filter by date range
+        if start_date:
+            df = df[df["date"] >= pd.to_datetime(start_date)]
+        if end_date:
+            df = df[df["date"] <= pd.to_datetime(end_date)]
+        # Filter by employee_ids
+        if employee_ids:
+            df = df[df["employee_id"].isin(employee_ids)]
+        # Group by employee, sum total_ot
+        if "total_ot" in df.columns:
+            summary = (
+                df.groupby(["employee_id"], observed=True)["total_ot"].sum().reset_index()
+            )
+        else:
+            summary = df.groupby(["employee_id"], observed=True).size().reset_index(name="total_overtime_hours")
     # Build response
     result = []
     for _, row in summary.iterrows():
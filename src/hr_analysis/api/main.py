@@ -1,37 +1,148 @@
-"""Main entry point for HR Analytics API."""
+"""Main entry point for HR Analytics API.
 
-import uvicorn
-from fastapi import FastAPI
-import sys
-from pathlib import Path
+The app, and with it FastAPI, the routers, pandas and the data layer, is only
+built on first access of `app` (uvicorn's "src.hr_analysis.api.main:app" import
+string, or `from src.hr_analysis.api.main import app`). Running this module as
+a script parses its arguments and cleans the data without importing any of it
+twice.
+"""
 
-app = FastAPI()
+import argparse
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Optional,
+)
 
-# Import and include routers here
-from src.hr_analysis.api.endpoints import (
-    dashboard,
-    employee,
-    report,
+from src.hr_analysis.api.startup import (
+    readiness,
+    run_startup,
 )
 
-app.include_router(employee.router)
-app.include_router(report.router)
-app.include_router(dashboard.router)
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+
+@asynccontextmanager
+async def lifespan(app: "FastAPI"):
+    """
+    Warm up before uvicorn starts accepting traffic (production mode), then keep
+    the standard report windows materialized for the current data in the background.
+    """
+    from src.hr_analysis.api.materialize import (
+        materialize_enabled,
+        materializer,
+    )
+    from src.hr_analysis.api.utils.push import push_hub
+
+    await run_startup(app)
+    # Without a dataset there is nothing to materialize; stay alive but not ready
+    if materialize_enabled() and readiness.error is None:
+        materializer.start(app)
+    yield
+    await materializer.close()
+    await push_hub.close()
+
+
+def create_app() -> "FastAPI":
+    """Builds the FastAPI app with all routers and middleware."""
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    from src.hr_analysis.api.endpoints import (
+        dashboard,
+        dataset,
+        employee,
+        events,
+        report,
+    )
+    from src.hr_analysis.api.utils.caching import conditional_get_middleware
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(employee.router)
+    app.include_router(report.router)
+    app.include_router(dashboard.router)
+    app.include_router(dataset.router)
+    app.include_router(events.router)
+
+    # ETag / If-None-Match and gzip for report and dashboard responses
+    app.middleware("http")(conditional_get_middleware)
+
+    @app.get("/")
+    def root():
+        """Root endpoint for health check."""
+        return {"status": "HR Analytics API is running"}
+
+    @app.get("/ready")
+    def ready():
+        """Readiness check: 200 once the dataset and report caches are warm, else 503."""
+        return JSONResponse(readiness.as_dict(), status_code=200 if readiness.ready else 503)
 
+    return app
+
+
+_app: Optional["FastAPI"] = None
+_app_lock = threading.Lock()
+
+
+def __getattr__(name: str) -> Any:
+    """Module attribute `app`, built on first access."""
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _app_lock:
+        if _app is None:
+            _app = create_app()
+    return _app
+
+
+def main() -> None:
+    """
+    Run the API with uvicorn.
+    - dev (default): always re-clean the data, auto-reload on code changes.
+    - production: clean only when unclean_data is newer than the cleaned store,
+      no reloader, and warm the dataset before accepting traffic.
+    """
+    from src.hr_analysis.api.startup import WARMUP_ENV_VAR
+
+    parser = argparse.ArgumentParser(description="Run the HR Analytics API.")
+    parser.add_argument("--mode", choices=["dev", "production"], default=os.environ.get("HR_ANALYSIS_MODE", "dev"))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=10000)
+    parser.add_argument(
+        "--partition-by-month",
+        action=argparse.BooleanOptionalAction,
+        help="Cleaned store layout (default: $HR_ANALYSIS_PARTITION_BY_MONTH, else keep the existing layout)",
+    )
+    args = parser.parse_args()
+
+    # Heavy imports only once the arguments are valid
+    import uvicorn
+
+    from src.hr_analysis.api.materialize import MATERIALIZE_ENV_VAR
+    from src.hr_analysis.data_cleaner import (
+        clean_all_csvs,
+        is_clean_data_stale,
+    )
+
+    # Results already stored for the current dataset version are reused
+    os.environ.setdefault(MATERIALIZE_ENV_VAR, "1")
+    if args.mode == "production":
+        if is_clean_data_stale(args.partition_by_month):
+            clean_all_csvs(partition_by_month=args.partition_by_month)
+        else:
+            print("Cleaned data is up to date, skipping cleaning.")
+        os.environ[WARMUP_ENV_VAR] = "1"
+        uvicorn.run("src.hr_analysis.api.main:app", host=args.host, port=args.port)
+    else:
+        # Clean data before starting the server
+        clean_all_csvs(partition_by_month=args.partition_by_month)
+        uvicorn.run("src.hr_analysis.api.main:app", host=args.host, port=args.port, reload=True)
 
-@app.get("/")
-def root():
-    """Root endpoint for health check."""
-    return {"status": "HR Analytics API is running"}
 
 # --- Allow running with 'python main.py' ---
 if __name__ == "__main__":
-    # Clean data before starting the server
-    from src.hr_analysis.data_cleaner import clean_all_csvs
-    clean_all_csvs()
-    uvicorn.run(
-        "src.hr_analysis.api.main:app",
-        host="0.0.0.0",
-        port=10000,
-        reload=True
-    )
+    main()
@@ -0,0 +1,309 @@
+"""Pre-materialized results for the standard report windows.
+
+Most report traffic asks for the same few windows per department: the current
+month to date, last month, quarter to date and year to date. After each cleaning
+run the API precomputes the overtime reports, department overtime and the
+attendance report for every such window and department, and stores each
+response body gzip-compressed under clean_data/materialized/<dataset version>/.
+
+The caching middleware looks a request up there (by dataset version, path and
+normalized query) before computing it, and serves the stored bytes as they are,
+compressed or not. Anything else, or anything the current version has no results
+for yet, is computed live as before. Results of older dataset versions are
+deleted by the next run.
+
+Inside the API the runs happen in a background task (ReportMaterializer) that
+starts after warm-up, so startup and time-to-ready do not wait for them, and that
+materializes again whenever the dataset version changes (ingest, compaction or a
+new cleaning run). It checks the version every few seconds and at once when
+nudged. Only one run is in progress at a time.
+
+Usage:
+    python -m src.hr_analysis.api.materialize [--as-of 2025-07-15]
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import (
+    date,
+    timedelta,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlencode
+
+from src.hr_analysis import data_cleaner
+
+# Set to "1" to materialize the standard windows during app startup
+MATERIALIZE_ENV_VAR = "HR_ANALYSIS_MATERIALIZE"
+MATERIALIZED_DIR_NAME = "materialized"
+MANIFEST_NAME = "manifest.json"
+GZIP_COMPRESS_LEVEL = 6
+# How often the background task checks the dataset version
+CHECK_INTERVAL_SECONDS = 10.0
+
+# Path -> extra parameter sets, each combined with every window; "department"
+# adds one entry per department plus one without the filter
+STANDARD_REPORTS: Dict[str, Dict[str, Any]] = {
+    "/reports/department-overtime": {"department": False, "variants": [{}]},
+    "/reports/overtime-department-comparison": {"department": False, "variants": [{}]},
+    "/reports/overtime-employee-comparison": {"department": False, "variants": [{}]},
+    "/reports/overtime-trends": {
+        "department": True,
+        "variants": [{}, {"granularity": "weekly"}, {"granularity": "monthly"}],
+    },
+    "/reports/overtime-month-comparison": {"department": True, "variants": [{}]},
+    "/reports/overtime-weekly-summary": {"department": True, "variants": [{}, {"week_start": "monday"}]},
+    "/reports/overtime-exceptions": {"department": True, "variants": [{}]},
+    "/reports/top-overtime-employees": {"department": True, "variants": [{}]},
+    "/reports/attendance": {"department": True, "variants": [{}]},
+}
+
+hits = 0
+misses = 0
+_stats_lock = threading.Lock()
+# Version dir -> whether a completed materialization is stored there
+_completed: Dict[Path, bool] = {}
+
+
+def materialize_enabled() -> bool:
+    return os.environ.get(MATERIALIZE_ENV_VAR, "0") == "1"
+
+
+def standard_windows(as_of: date) -> Dict[str, Tuple[str, str]]:
+    """The canonical (start_date, end_date) windows as of a day, as YYYY-MM-DD strings."""
+    month_start = as_of.replace(day=1)
+    last_month_end = month_start - timedelta(days=1)
+    quarter_start = as_of.replace(month=3 * ((as_of.month - 1) // 3) + 1, day=1)
+    return {
+        "current_month": (month_start.isoformat(), as_of.isoformat()),
+        "last_month": (last_month_end.replace(day=1).isoformat(), last_month_end.isoformat()),
+        "quarter_to_date": (quarter_start.isoformat(), as_of.isoformat()),
+        "year_to_date": (as_of.replace(month=1, day=1).isoformat(), as_of.isoformat()),
+    }
+
+
+def materialized_root() -> Path:
+    return data_cleaner.CLEAN_DATA_DIR / MATERIALIZED_DIR_NAME
+
+
+def entry_file(version: str, path: str, normalized_query: str) -> Path:
+    """Where the body for a request is stored; the query must be normalized like caching.normalize_query."""
+    digest = hashlib.sha1(f"{path}?{normalized_query}".encode("utf-8")).hexdigest()[:24]
+    return materialized_root() / version / f"{digest}.json.gz"
+
+
+def _has_results(version: str) -> bool:
+    """Whether a finished run stored results for `version`; checked on disk once per version."""
+    version_dir = materialized_root() / version
+    completed = _completed.get(version_dir)
+    if completed is None:
+        completed = _completed[version_dir] = (version_dir / MANIFEST_NAME).exists()
+    return completed
+
+
+def _mark_completed(version_dir: Path, completed: bool) -> None:
+    _completed.clear()
+    _completed[version_dir] = completed
+
+
+def lookup(version: str, path: str, normalized_query: str) -> Optional[bytes]:
+    """
+    The stored gzip body for a request at `version`, or None to compute it
+    live. Without stored results for the version nothing is read or counted.
+    """
+    global hits, misses
+    if not _has_results(version):
+        return None
+    try:
+        compressed = entry_file(version, path, normalized_query).read_bytes()
+    except FileNotFoundError:
+        compressed = None
+    with _stats_lock:
+        if compressed is None:
+            misses += 1
+        else:
+            hits += 1
+    return compressed
+
+
+def standard_requests(departments: List[str], as_of: date) -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+    """(path, sorted query items) for every standard report, window and department."""
+    for start_date, end_date in standard_windows(as_of).values():
+        for path, spec in STANDARD_REPORTS.items():
+            for department in ([None] + departments) if spec["department"] else [None]:
+                for variant in spec["variants"]:
+                    params = dict(variant, start_date=start_date, end_date=end_date)
+                    if department is not None:
+                        params["department"] = department
+                    yield path, sorted(params.items())
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+async def materialize_reports(app: Any, as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Computes and stores every standard request missing for the current dataset
+    version, through the app itself so stored bodies are byte-identical to live
+    responses. Returns the manifest, which is also written next to the results.
+    """
+    from src.hr_analysis.api.utils.push import fetch
+
+    as_of = as_of or date.today()
+    started = time.perf_counter()
+    version = await asyncio.to_thread(data_cleaner.get_dataset_version)
+    df = await asyncio.to_thread(data_cleaner.get_cleaned_df)
+    departments = sorted(str(value) for value in df["department"].dropna().unique()) if "department" in df else []
+
+    version_dir = materialized_root() / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = version_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {"entries": []}
+    known = {(entry["path"], entry["query"]) for entry in manifest["entries"]}
+    computed = 0
+    for path, items in standard_requests(departments, as_of):
+        normalized_query = "&".join(f"{key}={value}" for key, value in items)
+        if (path, normalized_query) in known:
+            continue
+        status, body = await fetch(app, path, urlencode(items))
+        if status != 200:
+            continue
+        target = entry_file(version, path, normalized_query)
+        await asyncio.to_thread(_write_atomic, target, gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL))
+        manifest["entries"].append({"path": path, "query": normalized_query, "file": target.name, "bytes": len(body)})
+        known.add((path, normalized_query))
+        computed += 1
+
+    if await asyncio.to_thread(data_cleaner.get_dataset_version) != version:
+        # The data changed while computing: these results are already stale
+        shutil.rmtree(version_dir, ignore_errors=True)
+        _mark_completed(version_dir, False)
+        return {"dataset_version": version, "entries": [], "stale": True}
+
+    manifest.update(
+        {
+            "dataset_version": version,
+            "as_of": as_of.isoformat(),
+            "windows": standard_windows(as_of),
+            "departments": departments,
+            "computed": computed,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    )
+    _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+    _mark_completed(version_dir, True)
+    for other in materialized_root().iterdir():
+        if other.is_dir() and other.name != version:
+            shutil.rmtree(other, ignore_errors=True)
+    return manifest
+
+
+class ReportMaterializer:
+    """Background task keeping the stored results in step with the current dataset version."""
+
+    def __init__(self, interval: float = CHECK_INTERVAL_SECONDS):
+        self.interval = interval
+        self.runs = 0
+        self.version: Optional[str] = None
+        self._app: Any = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, app: Any) -> None:
+        """Starts the task unless it is running; the first run begins right away."""
+        if self._task is not None and not self._task.done():
+            return
+        self._app = app
+        self.version = None
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self._watch())
+
+    def nudge(self) -> None:
+        """
+        Checks the dataset version now instead of at the next interval (e.g.
+        after an ingest). Safe to call from worker threads.
+        """
+        if self._wake is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _watch(self) -> None:
+        while True:
+            version = await asyncio.to_thread(data_cleaner.get_dataset_version)
+            if version != self.version:
+                try:
+                    manifest = await materialize_reports(self._app)
+                except Exception as exc:
+                    # Requests are still computed live; try again once the data changes
+                    print(f"Report materialization failed: {exc!r}")
+                    manifest = {"dataset_version": version}
+                self.runs += 1
+                # Stale results are discarded; the next pass materializes the newer version
+                if not manifest.get("stale"):
+                    self.version = manifest["dataset_version"]
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+materializer = ReportMaterializer()
+
+
+def materialized_summary() -> Dict[str, Any]:
+    """Manifest summary for the current dataset version plus lookup counters."""
+    manifest_path = materialized_root() / data_cleaner.get_dataset_version() / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else None
+    return {
+        "dataset_version": manifest["dataset_version"] if manifest else None,
+        "as_of": manifest["as_of"] if manifest else None,
+        "entries": len(manifest["entries"]) if manifest else 0,
+        "hits": hits,
+        "misses": misses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute the standard report windows for the cleaned dataset.")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="Day the windows are relative to (default: today)")
+    args = parser.parse_args()
+
+    from src.hr_analysis.api.main import app
+
+    manifest = asyncio.run(materialize_reports(app, args.as_of))
+    print(f"Materialized {manifest.get('computed', 0)} new results ({len(manifest['entries'])} total) "
+          f"for dataset {manifest['dataset_version']} in {materialized_root()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Startup warm-up and readiness state for HR Analytics API.
+
+In production mode the app loads the cleaned dataset and requests the most
+common reports from itself once before uvicorn starts accepting traffic, so the
+first real request does not pay for reading the CSV and those responses are
+already in the response cache. `/` stays a pure liveness check while `/ready`
+reports whether this warm-up has finished.
+"""
+
+import asyncio
+import os
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Set to "1" to warm the dataset and report caches during app startup
+WARMUP_ENV_VAR = "HR_ANALYSIS_WARMUP"
+
+# (path, query) of the reports requested during warm-up
+WARMUP_REQUESTS: List[Tuple[str, str]] = [
+    ("/reports/departments", ""),
+    ("/reports/employees", ""),
+    ("/reports/department-overtime", ""),
+    ("/reports/overtime-month-comparison", ""),
+    ("/reports/top-overtime-employees", "top_n=10"),
+]
+
+# Taken at first import, which is as early as the API entry point gets
+PROCESS_STARTED_AT = time.perf_counter()
+
+
+class ReadinessState:
+    """Tracks whether the app finished warming up and how long it took."""
+
+    def __init__(self):
+        self.ready = False
+        self.time_to_ready: Optional[float] = None
+        self.dataset_version: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def mark_ready(self, dataset_version: Optional[str] = None) -> None:
+        self.ready = True
+        self.time_to_ready = time.perf_counter() - PROCESS_STARTED_AT
+        self.dataset_version = dataset_version
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "time_to_ready_seconds": round(self.time_to_ready, 3) if self.time_to_ready is not None else None,
+            "dataset_version": self.dataset_version,
+            "error": self.error,
+        }
+
+
+readiness = ReadinessState()
+
+
+def warmup_enabled() -> bool:
+    return os.environ.get(WARMUP_ENV_VAR, "0") == "1"
+
+
+async def warm_up(app: Any) -> None:
+    """
+    Loads the cleaned dataset and requests the common reports through the app,
+    so their responses are cached before the first request.
+    Heavy modules are imported here rather than at startup.
+    """
+    from src.hr_analysis.api.utils.push import fetch
+    from src.hr_analysis.data_cleaner import (
+        get_cleaned_df,
+        get_dataset_version,
+    )
+
+    await asyncio.to_thread(get_cleaned_df)
+    for path, query in WARMUP_REQUESTS:
+        status, _ = await fetch(app, path, query)
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned {status}")
+    readiness.mark_ready(await asyncio.to_thread(get_dataset_version))
+
+
+async def run_startup(app: Any) -> None:
+    """Called from the app lifespan: warm up if enabled, else become ready at once."""
+    if not warmup_enabled():
+        readiness.mark_ready()
+        return
+    try:
+        await warm_up(app)
+    except FileNotFoundError as exc:
+        readiness.error = f"Cleaned dataset not found: {exc}"
+    except Exception as exc:
+        readiness.error = f"Loading the cleaned dataset failed: {exc!r}"
+    if readiness.error is not None:
+        # Stay alive but not ready; the liveness check keeps working
+        print(f"Warm-up failed: {readiness.error}")
+        return
+    print(f"HR Analytics API ready in {readiness.time_to_ready:.2f}s (dataset {readiness.dataset_version})")
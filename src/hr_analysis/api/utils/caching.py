@@ -0,0 +1,212 @@
+"""Conditional GET (ETag) and gzip response caching for HR Analytics API.
+
+Report and dashboard responses only change when the cleaned dataset changes, so
+their ETag is derived from the dataset version plus the normalized request
+(path and sorted query parameters). A request whose If-None-Match matches gets a
+304 before the endpoint runs, and response bodies (plain and gzip-compressed) are
+kept per ETag so repeated polls never recompute or recompress anything.
+Identical requests arriving while the first is still being computed wait for it
+instead of computing the report again (see single_flight). Standard report
+windows precomputed for the current dataset version are served from disk (see
+materialize).
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    Optional,
+    Tuple,
+)
+
+from fastapi import (
+    Request,
+    Response,
+)
+
+from src.hr_analysis.api import materialize
+from src.hr_analysis.api.utils.single_flight import report_flights
+from src.hr_analysis.data_cleaner import get_dataset_version
+
+# Paths whose GET responses are cached and served with an ETag
+CACHED_PATH_PREFIXES: Tuple[str, ...] = ("/reports", "/dashboard")
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+GZIP_COMPRESS_LEVEL = 6
+# Number of distinct ETags kept in memory
+MAX_CACHED_RESPONSES = 256
+# Total bytes of cached bodies (plain plus gzip) kept in memory
+MAX_CACHED_BYTES = 64 * 1024 * 1024
+# Bodies larger than this (e.g. full-dataset attendance exports) are never cached
+MAX_CACHED_BODY_BYTES = 4 * 1024 * 1024
+
+
+class CachedBody:
+    """Response body for one ETag, with its gzip variant built on first use."""
+
+    def __init__(self, body: bytes, media_type: str, status_code: int = 200, gzipped: Optional[bytes] = None):
+        self.body = body
+        self.media_type = media_type
+        self.status_code = status_code
+        self._gzipped = gzipped
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the body and, once built, its gzip variant."""
+        return len(self.body) + (len(self._gzipped) if self._gzipped is not None else 0)
+
+    def gzipped(self) -> bytes:
+        """Return the gzip-compressed body, compressing it only once."""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=GZIP_COMPRESS_LEVEL)
+        return self._gzipped
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU mapping of ETag -> CachedBody, bounded by entry count and
+    by total bytes. Bodies above `max_body_bytes` are not cached at all. A gzip
+    variant built after insertion is counted from the next insertion on.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MAX_CACHED_RESPONSES,
+        max_bytes: int = MAX_CACHED_BYTES,
+        max_body_bytes: int = MAX_CACHED_BODY_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_body_bytes = max_body_bytes
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag: str, entry: CachedBody) -> None:
+        if len(entry.body) > self.max_body_bytes:
+            return
+        with self._lock:
+            self._entries[etag] = entry
+            self._entries.move_to_end(etag)
+            total = self._nbytes()
+            while len(self._entries) > self.max_entries or (total > self.max_bytes and len(self._entries) > 1):
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted.nbytes
+
+    def _nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._nbytes()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache()
+
+
+def normalize_query(request: Request) -> str:
+    """
+    Returns the query string in a canonical form: parameters sorted by name and
+    value, with empty values dropped (the endpoints treat them as absent).
+    """
+    items = sorted((key, value) for key, value in request.query_params.multi_items() if value != "")
+    return "&".join(f"{key}={value}" for key, value in items)
+
+
+def compute_etag(version: str, path: str, normalized_query: str) -> str:
+    """Build a weak ETag from the dataset version and the normalized request."""
+    digest = hashlib.sha1(f"{version}|{path}?{normalized_query}".encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+async def _compute_body(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+    version: str,
+    etag: str,
+) -> CachedBody:
+    """Runs the endpoint once and caches its body if the data did not change meanwhile."""
+    response = await call_next(request)
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    entry = CachedBody(body, response.headers.get("content-type", "application/json"), response.status_code)
+    if response.status_code == 200 and get_dataset_version() == version:
+        response_cache.put(etag, entry)
+    return entry
+
+
+async def conditional_get_middleware(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    """
+    HTTP middleware adding ETag/If-None-Match handling and gzip compression to
+    report and dashboard GET requests. Register with app.middleware("http").
+    """
+    if request.method != "GET" or not request.url.path.startswith(CACHED_PATH_PREFIXES):
+        return await call_next(request)
+
+    version = get_dataset_version()
+    normalized_query = normalize_query(request)
+    etag = compute_etag(version, request.url.path, normalized_query)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    entry = response_cache.get(etag)
+    if entry is None:
+        compressed = materialize.lookup(version, request.url.path, normalized_query)
+        if compressed is not None:
+            entry = CachedBody(gzip.decompress(compressed), "application/json", gzipped=compressed)
+            response_cache.put(etag, entry)
+    if entry is None:
+        entry = await report_flights.run(etag, lambda: _compute_body(request, call_next, version, etag))
+        if entry.status_code != 200:
+            return Response(content=entry.body, status_code=entry.status_code, media_type=entry.media_type)
+        # Only advertise the ETag if the data did not change while it was computed
+        if get_dataset_version() != version:
+            headers.pop("ETag")
+
+    if accepts_gzip(request) and len(entry.body) >= GZIP_MIN_SIZE:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.gzipped(), media_type=entry.media_type, headers=headers)
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
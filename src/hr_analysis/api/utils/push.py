@@ -0,0 +1,226 @@
+"""Push of report updates to subscribed clients (server-sent events).
+
+Wall displays subscribe once to a report or dashboard request instead of polling
+it. A single watcher task checks the dataset version; when it changes, every
+distinct subscription (path + normalized query) is computed once through the app
+itself, so the response cache and single-flight apply, and the result is fanned
+out to all of its subscribers. Subscribers that only want to know that something
+changed get the new version without any report being computed.
+
+Each subscriber holds at most one pending event: a slow client skips straight to
+the latest result instead of queueing every intermediate one.
+"""
+
+import asyncio
+import json
+import os
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.hr_analysis.data_cleaner import get_dataset_version
+
+INTERVAL_ENV_VAR = "HR_ANALYSIS_PUSH_INTERVAL"
+DEFAULT_INTERVAL_SECONDS = 2.0
+# Comment line sent when nothing changed, so proxies keep the connection open
+KEEPALIVE_SECONDS = 15.0
+
+
+def push_interval() -> float:
+    return float(os.environ.get(INTERVAL_ENV_VAR, DEFAULT_INTERVAL_SECONDS))
+
+
+def format_event(event: str, data: str, event_id: Optional[str] = None) -> str:
+    """One server-sent event; multi-line data is split over several data: lines."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+async def fetch(app: Any, path: str, query: str) -> Tuple[int, bytes]:
+    """GETs `path?query` from the ASGI app in-process and returns (status, body)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "root_path": "",
+        "headers": [(b"host", b"internal"), (b"accept-encoding", b"identity")],
+        "client": None,
+        "server": ("internal", 80),
+    }
+    status = 500
+    chunks: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+class Subscriber:
+    """Mailbox of one connected client, holding only the latest undelivered event."""
+
+    def __init__(self):
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=1)
+
+    def offer(self, event: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class Subscription:
+    """All clients subscribed to the same path and normalized query, with or without results."""
+
+    def __init__(self, path: str, query: str, full: bool):
+        self.path = path
+        self.query = query
+        self.full = full
+        self.subscribers: Set[Subscriber] = set()
+
+    @property
+    def key(self) -> str:
+        return subscription_key(self.path, self.query, self.full)
+
+
+def subscription_key(path: str, query: str, full: bool) -> str:
+    return f"{path}?{query}#{'full' if full else 'version'}"
+
+
+class PushHub:
+    """Subscriptions plus the watcher task that publishes dataset changes to them."""
+
+    def __init__(self):
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.version: Optional[str] = None
+        self.computations = 0
+        self.events_sent = 0
+        self._app: Any = None
+        self._watcher: Optional["asyncio.Task[None]"] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def render(self, subscription: Subscription, version: str) -> str:
+        """The update event for `subscription` at `version`, computing the report if needed."""
+        payload: Dict[str, Any] = {"dataset_version": version, "path": subscription.path, "query": subscription.query}
+        if subscription.full:
+            self.computations += 1
+            try:
+                status, body = await fetch(self._app, subscription.path, subscription.query)
+            except Exception:
+                # The app already logged the error; subscribers see a 500 and keep their connection
+                status, body = 500, b""
+            payload["status"] = status
+            if status == 200:
+                payload["result"] = json.loads(body)
+            else:
+                payload["error"] = body.decode("utf-8", errors="replace")
+        return format_event("update", json.dumps(payload, separators=(",", ":")), version)
+
+    async def subscribe(
+        self, app: Any, path: str, query: str, full: bool, last_event_id: Optional[str] = None
+    ) -> Tuple[Subscription, Subscriber, Optional[str]]:
+        """
+        Registers a client and returns its subscription, its mailbox and the event
+        for the current state; None if the client already saw this version
+        (reconnect with Last-Event-ID).
+        """
+        self._app = app
+        key = subscription_key(path, query, full)
+        subscription = self.subscriptions.get(key)
+        if subscription is None:
+            subscription = self.subscriptions[key] = Subscription(path, query, full)
+        subscriber = Subscriber()
+        subscription.subscribers.add(subscriber)
+        started = self._ensure_watcher()
+        version = await run_in_threadpool(get_dataset_version)
+        if started:
+            self.version = version
+        if last_event_id == version:
+            return subscription, subscriber, None
+        return subscription, subscriber, await self.render(subscription, version)
+
+    def unsubscribe(self, subscription: Subscription, subscriber: Subscriber) -> None:
+        subscription.subscribers.discard(subscriber)
+        if not subscription.subscribers and self.subscriptions.get(subscription.key) is subscription:
+            del self.subscriptions[subscription.key]
+
+    async def publish(self, version: str) -> None:
+        """Computes every subscription once for `version` and delivers it to its subscribers."""
+        self.version = version
+        subscriptions = list(self.subscriptions.values())
+        events = await asyncio.gather(*(self.render(subscription, version) for subscription in subscriptions))
+        for subscription, event in zip(subscriptions, events):
+            for subscriber in list(subscription.subscribers):
+                subscriber.offer(event)
+                self.events_sent += 1
+
+    def nudge(self) -> None:
+        """
+        Checks the dataset version now instead of at the next interval (e.g.
+        after an ingest). Safe to call from worker threads.
+        """
+        if self._wake is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _ensure_watcher(self) -> bool:
+        """Starts the watcher unless it is running; returns whether it was started."""
+        if self._watcher is not None and not self._watcher.done():
+            return False
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._watcher = asyncio.ensure_future(self._watch())
+        return True
+
+    async def _watch(self) -> None:
+        while self.subscriptions:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=push_interval())
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            version = await run_in_threadpool(get_dataset_version)
+            if version != self.version and self.subscriptions:
+                await self.publish(version)
+
+    async def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._watcher = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscriptions": len(self.subscriptions),
+            "subscribers": sum(len(subscription.subscribers) for subscription in self.subscriptions.values()),
+            "computations": self.computations,
+            "events_sent": self.events_sent,
+        }
+
+
+push_hub = PushHub()
@@ -0,0 +1,94 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+When many clients ask for the same report at once (a dataset reload, the 9am
+dashboard refresh) only the first request computes it; the others wait for that
+computation and share its result. Requests are keyed by the same dataset version,
+path and normalized query that make up the response ETag, so a request arriving
+after the data changed never joins a computation over the old data.
+"""
+
+import asyncio
+import threading
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Tuple,
+)
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares its result."""
+
+    def __init__(self):
+        self._flights: Dict[str, "asyncio.Task[Any]"] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.waiting = 0
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the result of `compute()`, joining a computation already in
+        flight for `key` if there is one. The computation runs as its own task,
+        so a waiter being cancelled does not cancel it for the others. The task
+        still runs the leader's own request, though, and fails if that client
+        disconnects; a waiter whose joined computation failed therefore retries
+        once with its own `compute` (coalescing with other retrying waiters)
+        instead of inheriting the leader's failure.
+        """
+        retried = False
+        while True:
+            leader, task = self._join(key, compute)
+            try:
+                return await asyncio.shield(task)
+            except (Exception, asyncio.CancelledError):
+                # Only retry when the shared task failed, not when this caller was cancelled
+                if leader or retried or not task.done():
+                    raise
+                retried = True
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+
+    def _join(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[bool, "asyncio.Task[Any]"]:
+        """The task in flight for `key`, started from `compute` if none is; and whether it was started here."""
+        with self._lock:
+            task = self._flights.get(key)
+            leader = task is None
+            if leader:
+                task = asyncio.ensure_future(compute())
+                self._flights[key] = task
+                task.add_done_callback(lambda done, key=key: self._finish(key, done))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+            self.waiting += 1
+        return leader, task
+
+    def _finish(self, key: str, task: "asyncio.Task[Any]") -> None:
+        with self._lock:
+            if self._flights.get(key) is task:
+                del self._flights[key]
+        # Mark a failure as retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since start: computations run, requests that joined one, and current load."""
+        with self._lock:
+            return {
+                "computations": self.leaders,
+                "coalesced_requests": self.coalesced,
+                "in_flight": len(self._flights),
+                "waiting_requests": self.waiting,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.leaders = 0
+            self.coalesced = 0
+
+
+report_flights = SingleFlight()
@@ -0,0 +1,85 @@
+"""Calendar dimension for the cleaned HR data.
+
+Reports group attendance rows by day, week, month or quarter. Instead of
+formatting the `date` column with strftime for every row on every request, each
+row carries precomputed integer period keys and a small calendar table (one row
+per distinct day) maps keys back to the labels the API returns. Reports group on
+the integer keys and only attach labels to the aggregated rows.
+
+Key order matches label order, so sorting by key sorts labels the same way.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Key column -> label column in the calendar table
+PERIOD_LABELS: Dict[str, str] = {
+    "day_key": "day_label",  # YYYY-MM-DD
+    "iso_week_key": "iso_week_label",  # YYYY-Www, Monday weeks ("%Y-W%V")
+    "sunday_week_key": "sunday_week_label",  # YYYY-Www of the Sunday starting the week ("%Y-W%U")
+    "month_key": "month_label",  # YYYY-MM
+    "quarter_key": "quarter_label",  # YYYY-Qn
+}
+CALENDAR_KEY_COLUMNS = list(PERIOD_LABELS)
+# Key assigned to rows whose date could not be parsed
+MISSING_KEY = -1
+
+
+def day_numbers(dates: pd.Series) -> np.ndarray:
+    """Days since 1970-01-01 as int32, MISSING_KEY for NaT."""
+    values = pd.to_datetime(dates, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    days = values.astype("datetime64[D]").astype(np.int64)
+    days[np.isnat(values)] = MISSING_KEY
+    return days.astype(np.int32)
+
+
+def build_calendar(dates: pd.Series) -> pd.DataFrame:
+    """One row per distinct day in `dates`, sorted by day_key, with every key and label."""
+    day_keys = np.unique(day_numbers(dates))
+    day_keys = day_keys[day_keys != MISSING_KEY]
+    days = pd.DatetimeIndex(day_keys.astype("datetime64[D]"))
+    # Sunday-Saturday weeks are labelled by the Sunday that starts them
+    week_starts = days - pd.to_timedelta((days.weekday + 1) % 7, unit="D")
+    calendar = pd.DataFrame(
+        {
+            "day_key": day_keys,
+            "iso_week_key": days.year * 100 + days.isocalendar().week.to_numpy(),
+            "sunday_week_key": (week_starts - pd.Timestamp("1970-01-01")).days,
+            "month_key": days.year * 100 + days.month,
+            "quarter_key": days.year * 10 + days.quarter,
+            "day_label": days.strftime("%Y-%m-%d"),
+            "iso_week_label": days.strftime("%Y-W%V"),
+            "sunday_week_label": week_starts.strftime("%Y-W%U"),
+            "month_label": days.strftime("%Y-%m"),
+            "quarter_label": [f"{year}-Q{quarter}" for year, quarter in zip(days.year, days.quarter)],
+        }
+    )
+    for key in CALENDAR_KEY_COLUMNS:
+        calendar[key] = calendar[key].astype(np.int32)
+    return calendar
+
+
+def extend_calendar(calendar: pd.DataFrame, dates: pd.Series) -> pd.DataFrame:
+    """Calendar covering the days of `calendar` plus those in `dates`."""
+    known_days = pd.Series(calendar["day_key"].to_numpy().astype("datetime64[D]").astype("datetime64[ns]"))
+    return build_calendar(pd.concat([known_days, pd.Series(pd.to_datetime(dates, errors="coerce"))], ignore_index=True))
+
+
+def add_calendar_keys(df: pd.DataFrame, calendar: pd.DataFrame) -> pd.DataFrame:
+    """Attach the integer period keys of `calendar` to every row of `df` (in place)."""
+    day_keys = day_numbers(df["date"])
+    positions = np.searchsorted(calendar["day_key"].to_numpy(), day_keys)
+    positions = np.clip(positions, 0, max(len(calendar) - 1, 0))
+    missing = day_keys == MISSING_KEY
+    for key in CALENDAR_KEY_COLUMNS:
+        keys = calendar[key].to_numpy()[positions] if len(calendar) else np.full(len(df), MISSING_KEY, np.int32)
+        df[key] = np.where(missing, MISSING_KEY, keys).astype(np.int32)
+    return df
+
+
+def period_labels(calendar: pd.DataFrame, key: str) -> pd.Series:
+    """Mapping key value -> label for one period type, e.g. month_key -> "2025-07"."""
+    table = calendar[[key, PERIOD_LABELS[key]]].drop_duplicates(key)
+    return pd.Series(table[PERIOD_LABELS[key]].to_numpy(), index=table[key].to_numpy())
@@ -1,46 +1,467 @@
 """Data cleaning utilities for HR analysis."""
 
 
+import argparse
+import hashlib
+import os
+import shutil
+import threading
 import warnings
+from collections import OrderedDict
 from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
+import numpy as np
 import pandas as pd
 
+from src.hr_analysis import (
+    delta_log,
+    partitions,
+    run_report,
+)
+from src.hr_analysis.calendar_dim import (
+    add_calendar_keys,
+    build_calendar,
+    extend_calendar,
+)
+from src.hr_analysis.memory_compaction import (
+    compact_df,
+    concat_compacted,
+)
+from src.hr_analysis.row_keys import employee_date_keys
 
+THIS_DIR = Path(__file__).parent
+UNCLEAN_DATA_DIR = THIS_DIR.parent / "unclean_data"
+CLEAN_DATA_DIR = THIS_DIR.parent / "clean_data"
+CLEANED_CSV_NAME = "cleaned.csv"
+# Set to "0" to keep the cleaned DataFrame in its raw (uncompacted) dtypes
+COMPACT_ENV_VAR = "HR_ANALYSIS_COMPACT"
+# "1" writes the cleaned store as monthly partitions, "0" as cleaned.csv; unset keeps the existing layout
+PARTITION_ENV_VAR = "HR_ANALYSIS_PARTITION_BY_MONTH"
 
-# Internal cache for cleaned DataFrame
-_cleaned_df_cache = None
+# Start compacting the delta log once this many segments are pending
+COMPACTION_MIN_SEGMENTS = 8
+# Multi-partition DataFrames kept ready for repeated date ranges
+COMPOSED_CACHE_SIZE = 2
+# Partition name of the unpartitioned clean_data/cleaned.csv store
+MONOLITHIC_PARTITION = CLEANED_CSV_NAME
 
-def get_cleaned_df() -> pd.DataFrame:
+# Serializes loading the cache and applying delta segments to it
+_store_lock = threading.RLock()
+# Only one delta-log compaction runs at a time
+_compaction_lock = threading.Lock()
+# Fingerprint of the base store (cleaned.csv or partition catalog) the cache was built from
+_base_fingerprint = None
+# Whether the base store is month-partitioned (see partitions)
+_partitioned = False
+# Partition catalog of the base store, plus entries for months only present in deltas
+_catalog: Optional[List[Dict[str, Any]]] = None
+# row_order for the next delta row of a partitioned store (None without row order, see partitions)
+_next_row_order: Optional[int] = None
+# Loaded, compacted partitions by name
+_partition_frames: Dict[str, pd.DataFrame] = {}
+# Rows of all applied delta segments, later segments already winning
+_delta_frame: Optional[pd.DataFrame] = None
+# Names of the delta segments contained in the cache
+_applied_segments: List[str] = []
+# Calendar dimension (one row per distinct day) covering every loaded row
+_calendar_cache = None
+# Dataset version the cache corresponds to
+_cleaned_df_version = None
+# Concatenations of several partitions, keyed by partition names
+_composed_frames: "OrderedDict[Tuple[str, ...], pd.DataFrame]" = OrderedDict()
+
+
+def _base_store_fingerprint() -> str:
+    catalog_path = partitions.catalog_path(CLEAN_DATA_DIR)
+    path = catalog_path if catalog_path.exists() else CLEAN_DATA_DIR / CLEANED_CSV_NAME
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return "missing"
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _version_of(base_fingerprint: str, segment_names: List[str]) -> str:
+    fingerprint = "|".join([base_fingerprint] + segment_names)
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+def get_dataset_version() -> str:
+    """
+    Returns a short token identifying the cleaned dataset currently on disk:
+    the base store (cleaned.csv or its monthly partitions) plus any ingested
+    delta segments. The token changes whenever either changes, so it can be
+    used to key caches and ETags of anything derived from the cleaned data.
+    """
+    segment_names = [path.name for path in delta_log.list_segments(CLEAN_DATA_DIR)]
+    return _version_of(_base_store_fingerprint(), segment_names)
+
+
+def read_cleaned_store() -> pd.DataFrame:
+    """Reads the whole base store as written by clean_all_csvs(), without compaction or deltas."""
+    catalog = partitions.read_catalog(CLEAN_DATA_DIR)
+    if catalog is None:
+        return pd.read_csv(CLEAN_DATA_DIR / CLEANED_CSV_NAME, index_col=0)
+    df = partitions.in_row_order(pd.concat([partitions.read_partition(CLEAN_DATA_DIR, entry) for entry in catalog]))
+    return df.drop(columns=partitions.ROW_ORDER_COLUMN, errors="ignore")
+
+
+def _compaction_enabled() -> bool:
+    return os.environ.get(COMPACT_ENV_VAR, "1") != "0"
+
+
+def reset_cache() -> None:
+    """Drops everything cached from the cleaned store; the next access reloads it."""
+    global _base_fingerprint, _partitioned, _catalog, _next_row_order, _partition_frames, _delta_frame
+    global _applied_segments, _calendar_cache, _cleaned_df_version
+    with _store_lock:
+        _base_fingerprint = None
+        _partitioned = False
+        _catalog = None
+        _next_row_order = None
+        _partition_frames = {}
+        _delta_frame = None
+        _applied_segments = []
+        _calendar_cache = build_calendar(pd.Series([], dtype="datetime64[ns]"))
+        _cleaned_df_version = None
+        _composed_frames.clear()
+
+
+def _open_store() -> None:
+    """Reads the base store layout; partitions themselves are loaded on first use."""
+    global _base_fingerprint, _partitioned, _catalog, _next_row_order
+    reset_cache()
+    _base_fingerprint = _base_store_fingerprint()
+    catalog = partitions.read_catalog(CLEAN_DATA_DIR)
+    _partitioned = catalog is not None
+    if _partitioned:
+        _next_row_order = partitions.next_row_order(catalog)
+    if catalog is None:
+        catalog = [
+            {
+                "name": MONOLITHIC_PARTITION,
+                "file": CLEANED_CSV_NAME,
+                "month": None,
+                "min_date": None,
+                "max_date": None,
+                "rows": None,
+            }
+        ]
+    _catalog = catalog
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Compacts freshly read rows and attaches their calendar keys."""
+    global _calendar_cache
+    if _compaction_enabled():
+        df = compact_df(df)
+    if "date" in df.columns:
+        _calendar_cache = extend_calendar(_calendar_cache, df["date"])
+        add_calendar_keys(df, _calendar_cache)
+    return df
+
+
+def _combine(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    if len(frames) == 1:
+        return frames[0]
+    if _compaction_enabled():
+        return concat_compacted(frames)
+    return pd.concat(frames)
+
+
+def _overlay(frame: Optional[pd.DataFrame], newer: pd.DataFrame) -> pd.DataFrame:
+    """Rows of `frame` not superseded by `newer` (same employee and day), then `newer`."""
+    if frame is None:
+        return newer
+    if newer.empty:
+        return frame
+    return _combine([frame[~delta_log.superseded_mask(frame, newer)], newer])
+
+
+def _partition_of(df: pd.DataFrame) -> np.ndarray:
+    if not _partitioned:
+        return np.full(len(df), MONOLITHIC_PARTITION, dtype=object)
+    return partitions.partition_names(df["date"])
+
+
+def _load_partition(entry: Dict[str, Any]) -> pd.DataFrame:
+    name = entry["name"]
+    frame = _partition_frames.get(name)
+    if frame is None:
+        if not _partitioned:
+            frame = _prepare(pd.read_csv(CLEAN_DATA_DIR / CLEANED_CSV_NAME, index_col=0))
+        elif entry["file"] is not None:
+            frame = _prepare(partitions.read_partition(CLEAN_DATA_DIR, entry))
+        if _delta_frame is not None:
+            frame = _overlay(frame, _delta_frame[_partition_of(_delta_frame) == name])
+        _partition_frames[name] = frame
+    return frame
+
+
+def _widen_catalog(name: str, rows: pd.DataFrame) -> None:
+    """Makes the catalog entry of `name` cover delta rows, adding it for new months."""
+    entry = next((entry for entry in _catalog if entry["name"] == name), None)
+    if entry is None:
+        # Month only present in deltas: nothing on disk to read
+        entry = dict(partitions.partition_entry(name, rows), file=None, rows=0)
+        _catalog.append(entry)
+    added = partitions.partition_entry(name, rows)
+    if entry["min_date"] is not None and added["min_date"] is not None:
+        entry["min_date"] = min(entry["min_date"], added["min_date"])
+        entry["max_date"] = max(entry["max_date"], added["max_date"])
+    entry["rows"] = (entry["rows"] or 0) + added["rows"]
+
+
+def _apply_segments(segments: List[Path]) -> None:
+    """Replays delta segments onto the cache; later rows win per employee and day."""
+    global _delta_frame, _applied_segments, _next_row_order
+    for path in segments:
+        batch = _prepare(delta_log.read_segment(path))
+        if _next_row_order is not None:
+            # Numbered after every row so far, like rows appended to cleaned.csv
+            batch[partitions.ROW_ORDER_COLUMN] = np.arange(_next_row_order, _next_row_order + len(batch))
+            _next_row_order += len(batch)
+        _delta_frame = _overlay(_delta_frame, batch)
+        names = _partition_of(batch)
+        for name in pd.unique(names):
+            rows = batch[names == name]
+            if _partitioned:
+                _widen_catalog(name, rows)
+            if name in _partition_frames:
+                _partition_frames[name] = _overlay(_partition_frames[name], rows)
+        _applied_segments = _applied_segments + [path.name]
+    if segments:
+        _composed_frames.clear()
+
+
+def _sync_store() -> None:
+    """Brings the cache up to date with the store on disk. Caller holds _store_lock."""
+    global _cleaned_df_version
+    base_fingerprint = _base_store_fingerprint()
+    segments = delta_log.list_segments(CLEAN_DATA_DIR)
+    segment_names = [path.name for path in segments]
+    version = _version_of(base_fingerprint, segment_names)
+    if _catalog is not None and version == _cleaned_df_version:
+        return
+    if (
+        _catalog is None
+        or base_fingerprint != _base_fingerprint
+        or segment_names[: len(_applied_segments)] != _applied_segments
+    ):
+        _open_store()
+    _apply_segments(segments[len(_applied_segments):])
+    _cleaned_df_version = version
+
+
+def _parse_bound(value: Optional[str]) -> Optional[pd.Timestamp]:
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value)
+    except (TypeError, ValueError):
+        # Unparseable bound: do not prune, the report's own filter decides
+        return None
+
+
+def get_cleaned_df(start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
     """
-    Loads and returns the cleaned DataFrame from disk (clean_data/cleaned.csv) only once.
-    Subsequent calls return the cached DataFrame in memory.
+    Returns the cleaned DataFrame, loaded from clean_data/ and cached in memory
+    until the dataset version changes. A rebuilt base store triggers a reload;
+    new delta segments (see ingest_batch) are only read and appended.
+
+    With a month-partitioned store, passing a report's start_date/end_date
+    (YYYY-MM-DD) returns only the partitions overlapping that range; rows
+    outside it may still be present, so reports keep their own date filters.
+    The cleaned.csv store is always returned whole.
+
+    Frames are memory-compacted on load (see memory_compaction.compact_df)
+    unless HR_ANALYSIS_COMPACT=0, and carry the integer period keys of the
+    calendar dimension (see calendar_dim).
     Usage: from src.hr_analysis.data_cleaner import get_cleaned_df
     """
-    global _cleaned_df_cache
-    if _cleaned_df_cache is None:
-        base_dir = Path(__file__).parent.parent
-        cleaned_path = base_dir / "clean_data" / "cleaned.csv"
-        _cleaned_df_cache = pd.read_csv(cleaned_path, index_col=0)
-    return _cleaned_df_cache
+    with _store_lock:
+        _sync_store()
+        start, end = _parse_bound(start_date), _parse_bound(end_date)
+        if _partitioned and (start is not None or end is not None):
+            entries = partitions.overlapping(_catalog, start, end)
+        else:
+            entries = _catalog
+        entries = sorted(entries, key=lambda entry: entry["name"])
+        if not entries:
+            # Nothing overlaps: an empty frame with the usual columns and dtypes
+            return _load_partition(_catalog[0]).iloc[0:0] if _catalog else pd.DataFrame()
+        frames = [_load_partition(entry) for entry in entries]
+        if len(frames) == 1:
+            return frames[0]
+        key = tuple(entry["name"] for entry in entries)
+        composed = _composed_frames.get(key)
+        if composed is None:
+            # Partitions are concatenated by month; restore the cleaned output's row order
+            composed = partitions.in_row_order(_combine(frames))
+            _composed_frames[key] = composed
+            while len(_composed_frames) > COMPOSED_CACHE_SIZE:
+                _composed_frames.popitem(last=False)
+        else:
+            _composed_frames.move_to_end(key)
+        return composed
+
 
+def get_calendar() -> pd.DataFrame:
+    """Returns the calendar dimension covering every row get_cleaned_df() has loaded."""
+    with _store_lock:
+        _sync_store()
+        return _calendar_cache
 
-def clean_all_csvs() -> None:
+
+def ingest_batch(df: pd.DataFrame) -> Path:
     """
-    Cleans all CSV files in unclean_data:
-    - Strips leading/trailing spaces from column names
-    - Converts column names to lowercase and replaces spaces with underscores
-    - Uniforms columns with date values to pandas datetime format
-    - Saves cleaned files with '_cleaned' suffix in unclean_data
+    Cleans a raw attendance batch with the same rules as clean_all_csvs(),
+    appends it to the delta log and applies it to the cached DataFrame, so
+    queries see it right away. Returns the written segment path.
+    Raises ValueError when the batch has no employee_id or date column.
     """
-    global merged_df
-    base_dir = Path(__file__).parent.parent
-    unclean_dir = base_dir / "unclean_data"
-    csv_files = list(unclean_dir.glob("*.csv"))
-    cleaned_dfs = []
-    for f in csv_files:
-        df = pd.read_csv(f, low_memory=False)
-        # Normalize column names (expand variants)
+    cleaned = clean_frame(df)
+    missing = [col for col in ["employee_id", "date"] if col not in cleaned.columns]
+    if missing:
+        raise ValueError(f"Attendance batch is missing required column(s): {', '.join(missing)}")
+    batch = merge_cleaned_frames([cleaned])
+    with _store_lock:
+        path = delta_log.write_segment(CLEAN_DATA_DIR, batch)
+        if _catalog is not None:
+            _sync_store()
+    return path
+
+
+def pending_segment_count() -> int:
+    return len(delta_log.list_segments(CLEAN_DATA_DIR))
+
+
+def _merge_into(existing: Optional[pd.DataFrame], newer: pd.DataFrame) -> pd.DataFrame:
+    if existing is None:
+        return newer
+    return pd.concat([existing[~delta_log.superseded_mask(existing, newer)], newer])
+
+
+def compact_delta_log() -> int:
+    """
+    Merges all pending delta segments into the base store and archives them
+    (see delta_log), so clean_all_csvs() can replay them after a rebuild.
+    With a partitioned store only the months the deltas touch are rewritten.
+    The merge runs without blocking queries; only the final file swap holds
+    the store lock. Returns the number of segments merged.
+    """
+    global _base_fingerprint, _catalog, _delta_frame, _applied_segments, _cleaned_df_version
+    if not _compaction_lock.acquire(blocking=False):
+        return 0
+    try:
+        segments = delta_log.list_segments(CLEAN_DATA_DIR)
+        if not segments:
+            return 0
+        old_fingerprint = _base_store_fingerprint()
+        delta = None
+        for path in segments:
+            delta = _merge_into(delta, delta_log.read_segment(path))
+
+        replacements = []
+        catalog = partitions.read_catalog(CLEAN_DATA_DIR)
+        if catalog is None:
+            cleaned_path = CLEAN_DATA_DIR / CLEANED_CSV_NAME
+            base = pd.read_csv(cleaned_path, index_col=0) if cleaned_path.exists() else None
+            tmp_path = cleaned_path.with_suffix(".compacting")
+            _merge_into(base, delta).to_csv(tmp_path)
+            replacements.append((tmp_path, cleaned_path))
+        else:
+            entries = {entry["name"]: entry for entry in catalog}
+            row_order = partitions.next_row_order(catalog)
+            if row_order is not None:
+                delta = delta.assign(**{partitions.ROW_ORDER_COLUMN: np.arange(row_order, row_order + len(delta))})
+            names = partitions.partition_names(delta["date"])
+            for name in sorted(set(names)):
+                existing = partitions.read_partition(CLEAN_DATA_DIR, entries[name]) if name in entries else None
+                merged = _merge_into(existing, delta[names == name])
+                entry = partitions.partition_entry(name, merged)
+                path = partitions.partition_dir(CLEAN_DATA_DIR) / entry["file"]
+                tmp_path = path.with_suffix(".compacting")
+                merged.to_csv(tmp_path)
+                replacements.append((tmp_path, path))
+                entries[name] = entry
+            catalog = list(entries.values())
+
+        merged_names = [path.name for path in segments]
+        with _store_lock:
+            if _base_store_fingerprint() != old_fingerprint:
+                # The base store was rebuilt meanwhile; keep the segments for the next run
+                for tmp_path, _ in replacements:
+                    tmp_path.unlink()
+                return 0
+            for tmp_path, path in replacements:
+                os.replace(tmp_path, path)
+            if catalog is not None:
+                partitions.write_catalog(CLEAN_DATA_DIR, catalog)
+            for path in segments:
+                delta_log.archive_segment(CLEAN_DATA_DIR, path)
+            # The cache already holds exactly these rows: adopt the new base without reloading
+            if _base_fingerprint == old_fingerprint and _applied_segments == merged_names:
+                _base_fingerprint = _base_store_fingerprint()
+                if _partitioned:
+                    _catalog = partitions.read_catalog(CLEAN_DATA_DIR)
+                _delta_frame = None
+                _applied_segments = []
+                _cleaned_df_version = _version_of(_base_fingerprint, [])
+        return len(segments)
+    finally:
+        _compaction_lock.release()
+
+
+def partitioning_enabled(partition_by_month: Optional[bool] = None) -> bool:
+    """
+    Resolves the store layout to write: an explicit argument wins, then
+    HR_ANALYSIS_PARTITION_BY_MONTH, and otherwise the layout already on disk,
+    so a partitioned store is never silently reverted to cleaned.csv.
+    """
+    if partition_by_month is not None:
+        return partition_by_month
+    setting = os.environ.get(PARTITION_ENV_VAR)
+    if setting is not None:
+        return setting == "1"
+    return partitions.catalog_path(CLEAN_DATA_DIR).exists()
+
+
+def is_clean_data_stale(partition_by_month: Optional[bool] = None) -> bool:
+    """
+    Returns True when the cleaned store (clean_data/cleaned.csv or its partition
+    catalog) is missing, has a different layout than partitioning_enabled()
+    asks for, or is older than any CSV in unclean_data, i.e. when
+    clean_all_csvs() has to run before serving.
+    """
+    catalog_path = partitions.catalog_path(CLEAN_DATA_DIR)
+    cleaned_path = catalog_path if catalog_path.exists() else CLEAN_DATA_DIR / CLEANED_CSV_NAME
+    if not cleaned_path.exists() or partitioning_enabled(partition_by_month) != catalog_path.exists():
+        return True
+    cleaned_mtime = cleaned_path.stat().st_mtime_ns
+    return any(f.stat().st_mtime_ns > cleaned_mtime for f in UNCLEAN_DATA_DIR.glob("*.csv"))
+
+
+def clean_frame(
+    df: pd.DataFrame, profiler: Optional[run_report.RunProfiler] = None, source: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Cleans one raw attendance DataFrame (one CSV file or ingested batch):
+    - Maps column name variants to employee_id / date, other names to lowercase snake_case
+    - Strips leading/trailing spaces from all string values
+    - Parses the date column with the supported formats
+    Each step is timed as a stage of `source` when a profiler is given.
+    """
+    profiler = profiler or run_report.RunProfiler(enabled=False)
+    # Normalize column names (expand variants)
+    with profiler.stage(run_report.NORMALIZE_COLUMNS, source):
         col_map = {}
         for col in df.columns:
             norm = col.strip().replace(' ', '_').replace('__', '_').lower()
@@ -52,44 +473,68 @@ def clean_all_csvs() -> None:
             else:
                 col_map[col] = norm
         df.rename(columns=col_map, inplace=True)
-        # Strip spaces from all string values in all columns
+    # Strip spaces from all string values in all columns
+    with profiler.stage(run_report.STRIP, source):
         for col in df.columns:
             df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
-        # Convert date columns to datetime (add more formats)
-        if "date" in df.columns:
-            import warnings
-            def try_parse(val):
-                for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d", "%d-%m-%Y", "%m-%d-%Y", "%Y.%m.%d", "%b %d %Y", "%b  %d %Y", "%b %d %Y "]:
-                    try:
-                        return pd.to_datetime(val, format=fmt)
-                    except Exception:
-                        continue
+    # Convert date columns to datetime (add more formats)
+    if "date" in df.columns:
+        def try_parse(val):
+            for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d", "%d-%m-%Y", "%m-%d-%Y", "%Y.%m.%d", "%b %d %Y", "%b  %d %Y", "%b %d %Y "]:
                 try:
-                    with warnings.catch_warnings():
-                        warnings.filterwarnings("ignore", category=UserWarning, module="pandas")
-                        return pd.to_datetime(val)
+                    return pd.to_datetime(val, format=fmt)
                 except Exception:
-                    return val
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=UserWarning, module="pandas")
-                df["date"] = df["date"].apply(try_parse)
-        cleaned_dfs.append(df)
-    # Create unique column for each DataFrame
-    for i, df in enumerate(cleaned_dfs):
-        if "employee_id" in df.columns and "date" in df.columns:
-            df["employee_date_id"] = df["employee_id"].astype(str) + "_" + df["date"].astype(str)
-        else:
-            df["employee_date_id"] = df.index.map(lambda x: f"unidentified_{i}_{str(x)}")
+                    continue
+            try:
+                with warnings.catch_warnings():
+                    warnings.filterwarnings("ignore", category=UserWarning, module="pandas")
+                    return pd.to_datetime(val)
+            except Exception:
+                return val
+        with profiler.stage(run_report.PARSE_DATES, source), warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning, module="pandas")
+            df["date"] = df["date"].apply(try_parse)
+    return df
+
+
+def _first_column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Column `name` of df; the first one if several columns map to that name."""
+    column = df[name]
+    return column.iloc[:, 0] if isinstance(column, pd.DataFrame) else column
+
+
+def merge_cleaned_frames(
+    cleaned_dfs: List[pd.DataFrame], profiler: Optional[run_report.RunProfiler] = None
+) -> pd.DataFrame:
+    """
+    Merges DataFrames returned by clean_frame() into one cleaned dataset:
+    drops rows repeating an (employee_id, date) pair, duplicate columns, and
+    coerces employee_id / date to strings. Dedup runs on integer row keys (see
+    row_keys); the result is indexed by the readable employee_date_id.
+    Steps and row/column counts are recorded when a profiler is given.
+    """
+    profiler = profiler or run_report.RunProfiler(enabled=False)
+    identified = [("employee_id" in df.columns and "date" in df.columns) for df in cleaned_dfs]
     # Concatenate all cleaned DataFrames
-    merged_df = pd.concat(cleaned_dfs, axis=0, ignore_index=True)
-    # Remove duplicate columns by name
-    merged_df = merged_df.loc[:, ~merged_df.columns.duplicated()]
-    # Remove duplicate rows by 'employee_date_id'
-    if "employee_date_id" in merged_df.columns:
-        merged_df.drop_duplicates(subset=["employee_date_id"], inplace=True)
-        merged_df.set_index("employee_date_id", inplace=True)
+    with profiler.stage(run_report.CONCAT):
+        merged_df = pd.concat(cleaned_dfs, axis=0, ignore_index=True)
     # Remove duplicate columns by name
-    merged_df = merged_df.loc[:,~merged_df.columns.duplicated()]
+    with profiler.stage(run_report.DROP_DUPLICATE_COLUMNS):
+        merged_df = merged_df.loc[:, ~merged_df.columns.duplicated()]
+    profiler.count("rows_before_dedup", len(merged_df))
+    profiler.count("columns_before_dedup", len(merged_df.columns))
+    # Remove duplicate rows by (employee_id, date); rows of files lacking either column are all kept
+    with profiler.stage(run_report.DEDUP):
+        row_identified = np.repeat(identified, [len(df) for df in cleaned_dfs])
+        if row_identified.any():
+            # Keyed per source frame, before concat coerces dtypes (101 vs 101.0)
+            keyed = [df for df, has_key in zip(cleaned_dfs, identified) if has_key]
+            keys = -1 - np.arange(len(merged_df), dtype=np.int64)
+            keys[row_identified] = employee_date_keys(
+                [_first_column(df, "employee_id") for df in keyed], [_first_column(df, "date") for df in keyed]
+            )
+            merged_df = merged_df[~pd.Series(keys).duplicated().to_numpy()]
+    profiler.count("rows_after_dedup", len(merged_df))
     # Remove duplicate columns by content
     def drop_duplicate_content(df, exclude=None):
         if exclude is None:
@@ -101,14 +546,16 @@ def clean_all_csvs() -> None:
                 if df[cols[i]].equals(df[cols[j]]):
                     to_drop.add(cols[j])
         return df.drop(columns=list(to_drop))
-    merged_df = drop_duplicate_content(merged_df, exclude=["employee_date_id"])
-    # Robustly handle duplicate columns and types for employee_id and date
-    for col_base in ["employee_id", "date"]:
-        cols = [c for c in merged_df.columns if c.startswith(col_base)]
-        if len(cols) > 1:
-            # Prefer non-null values, then drop others
-            merged_df[col_base] = merged_df[cols].bfill(axis=1).iloc[:, 0]
-            merged_df.drop(columns=[c for c in cols if c != col_base], inplace=True)
+    with profiler.stage(run_report.DROP_DUPLICATE_COLUMNS):
+        merged_df = drop_duplicate_content(merged_df)
+        # Robustly handle duplicate columns and types for employee_id and date
+        for col_base in ["employee_id", "date"]:
+            cols = [c for c in merged_df.columns if c.startswith(col_base)]
+            if len(cols) > 1:
+                # Prefer non-null values, then drop others
+                merged_df[col_base] = merged_df[cols].bfill(axis=1).iloc[:, 0]
+                merged_df.drop(columns=[c for c in cols if c != col_base], inplace=True)
+    profiler.count("columns_after_dedup", len(merged_df.columns))
     # Ensure employee_id and date are string type and not DataFrame
     for col_base in ["employee_id", "date"]:
         if col_base in merged_df.columns:
@@ -117,16 +564,108 @@ def clean_all_csvs() -> None:
                 merged_df[col_base] = col.iloc[:, 0].astype(str)
             else:
                 merged_df[col_base] = col.astype(str)
-    # Create unique column and set as index
+    # Readable ID, built once for the rows that are written out
     if "employee_id" in merged_df.columns and "date" in merged_df.columns:
-        merged_df["employee_date_id"] = merged_df["employee_id"].astype(str) + "_" + merged_df["date"].astype(str)
-        merged_df.set_index("employee_date_id", inplace=True)
-    clean_dir = base_dir / "clean_data"
-    clean_dir.mkdir(exist_ok=True)
-    cleaned_path = clean_dir / "cleaned.csv"
-    merged_df.to_csv(cleaned_path)
-    print(f"Cleaned file saved successfully to: {cleaned_path}")
+        merged_df.index = pd.Index(merged_df["employee_id"] + "_" + merged_df["date"], name="employee_date_id")
+    else:
+        # No file had both columns, so no row was deduplicated
+        merged_df.index = pd.Index(
+            [f"unidentified_{i}_{x}" for i, df in enumerate(cleaned_dfs) for x in df.index], name="employee_date_id"
+        )
+    return merged_df
+
+
+def clean_all_csvs(
+    partition_by_month: Optional[bool] = None, profile: bool = False, trace_memory: bool = False
+) -> Dict[str, Any]:
+    """
+    Cleans all CSV files in unclean_data:
+    - Strips leading/trailing spaces from column names
+    - Converts column names to lowercase and replaces spaces with underscores
+    - Uniforms columns with date values to pandas datetime format
+    - Replays compacted ingested batches (clean_data/deltas/archive) on top
+    - Saves the merged, deduplicated result to clean_data/cleaned.csv, or with
+      partition_by_month=True to one file per month under clean_data/partitions
+      plus a catalog (see partitions). With partition_by_month=None the layout
+      comes from HR_ANALYSIS_PARTITION_BY_MONTH or else the existing store.
+    Writes a run report with per-file and per-stage timings and the RSS
+    high-water mark to clean_data/cleaning_report.json and returns it (see
+    run_report). trace_memory=True adds tracemalloc peaks per stage at a large
+    slowdown; profile=True also profiles the run with cProfile into
+    clean_data/cleaning_profile.prof.
+    """
+    global merged_df
+    partition_by_month = partitioning_enabled(partition_by_month)
+    profiler = run_report.RunProfiler(trace_memory=trace_memory)
+    cprofile = None
+    if profile:
+        import cProfile
+
+        cprofile = cProfile.Profile()
+        cprofile.enable()
+    profiler.start()
+    try:
+        unclean_dir = UNCLEAN_DATA_DIR
+        csv_files = list(unclean_dir.glob("*.csv"))
+        cleaned_dfs = []
+        for f in csv_files:
+            with profiler.stage(run_report.READ, f.name):
+                df = pd.read_csv(f, low_memory=False)
+            profiler.describe_file(f.name, f, df)
+            cleaned_dfs.append(clean_frame(df, profiler, f.name))
+        merged_df = merge_cleaned_frames(cleaned_dfs, profiler)
+        # Compacted ingested batches are not in unclean_data; replay them in arrival order
+        with profiler.stage(run_report.REPLAY_INGESTED):
+            for path in delta_log.list_archived_segments(CLEAN_DATA_DIR):
+                merged_df = _merge_into(merged_df, delta_log.read_segment(path))
+        clean_dir = CLEAN_DATA_DIR
+        clean_dir.mkdir(exist_ok=True)
+        cleaned_path = clean_dir / CLEANED_CSV_NAME
+        with profiler.stage(run_report.WRITE):
+            if partition_by_month:
+                entries = partitions.write_partitions(clean_dir, merged_df)
+                if cleaned_path.exists():
+                    cleaned_path.unlink()
+                output = partitions.partition_dir(clean_dir)
+            else:
+                merged_df.to_csv(cleaned_path)
+                if partitions.partition_dir(clean_dir).exists():
+                    shutil.rmtree(partitions.partition_dir(clean_dir))
+                output = cleaned_path
+    finally:
+        profiler.stop()
+        if cprofile is not None:
+            cprofile.disable()
+    if partition_by_month:
+        print(f"Cleaned data saved as {len(entries)} monthly partitions to: {output}")
+    else:
+        print(f"Cleaned file saved successfully to: {output}")
+
+    profile_path = None
+    if cprofile is not None:
+        profile_path = clean_dir / run_report.PROFILE_NAME
+        cprofile.dump_stats(profile_path)
+    report = profiler.report(
+        output=str(output),
+        partition_by_month=partition_by_month,
+        source_files=len(csv_files),
+        profile=str(profile_path) if profile_path else None,
+    )
+    print(f"Run report saved to: {run_report.write_run_report(report, clean_dir)}")
+    return report
 
 
 if __name__ == "__main__":
-    clean_all_csvs()
+    parser = argparse.ArgumentParser(description="Clean all CSV files in unclean_data.")
+    parser.add_argument(
+        "--partition-by-month",
+        action=argparse.BooleanOptionalAction,
+        help=f"Monthly partitions or cleaned.csv (default: ${PARTITION_ENV_VAR}, else keep the existing layout)",
+    )
+    parser.add_argument("--profile", action="store_true", help="Also dump cProfile stats next to the run report")
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="Also record tracemalloc memory peaks per stage (much slower)"
+    )
+    args = parser.parse_args()
+    clean_all_csvs(partition_by_month=args.partition_by_month, profile=args.profile,
+                   trace_memory=args.trace_memory)
@@ -0,0 +1,108 @@
+"""Append-only delta log for ingested attendance batches.
+
+Each ingested batch is cleaned with the same rules as clean_all_csvs() and
+written as one immutable segment file under clean_data/deltas/. Segments are
+numbered so they can be replayed in arrival order on top of cleaned.csv; a later
+segment supersedes earlier rows for the same employee and day. Compaction folds
+segments into cleaned.csv and moves them to clean_data/deltas/archive/. The
+archive is the durable record of ingested data: clean_all_csvs() rebuilds the
+store from unclean_data and then replays the archived segments, so a rebuild
+never drops compacted batches.
+"""
+
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from src.hr_analysis.calendar_dim import (
+    MISSING_KEY,
+    day_numbers,
+)
+from src.hr_analysis.row_keys import employee_day_keys
+
+DELTA_DIR_NAME = "deltas"
+ARCHIVE_DIR_NAME = "archive"
+SEGMENT_PREFIX = "delta_"
+SEGMENT_SUFFIX = ".csv"
+
+
+def delta_dir(clean_dir: Path) -> Path:
+    return clean_dir / DELTA_DIR_NAME
+
+
+def archive_dir(clean_dir: Path) -> Path:
+    return delta_dir(clean_dir) / ARCHIVE_DIR_NAME
+
+
+def _segments_in(directory: Path) -> List[Path]:
+    if not directory.exists():
+        return []
+    return sorted(directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+
+def list_segments(clean_dir: Path) -> List[Path]:
+    """Pending (not yet compacted) segment files in arrival order."""
+    return _segments_in(delta_dir(clean_dir))
+
+
+def list_archived_segments(clean_dir: Path) -> List[Path]:
+    """Compacted segment files in arrival order."""
+    return _segments_in(archive_dir(clean_dir))
+
+
+def archive_segment(clean_dir: Path, path: Path) -> Path:
+    """Moves a compacted segment to the archive, keeping its sequence number."""
+    directory = archive_dir(clean_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / path.name
+    os.replace(path, target)
+    return target
+
+
+def write_segment(clean_dir: Path, df: pd.DataFrame) -> Path:
+    """
+    Writes a cleaned batch as the next segment. The file is written under a
+    temporary name and renamed, so readers never see a partial segment.
+    """
+    directory = delta_dir(clean_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Numbering continues after archived segments so replay order stays arrival order
+    segments = list_archived_segments(clean_dir) + list_segments(clean_dir)
+    next_seq = max(int(segment.stem[len(SEGMENT_PREFIX):]) for segment in segments) + 1 if segments else 1
+    path = directory / f"{SEGMENT_PREFIX}{next_seq:08d}{SEGMENT_SUFFIX}"
+    tmp_path = path.with_suffix(".tmp")
+    df.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_segment(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, index_col=0)
+
+
+def superseded_mask(existing: pd.DataFrame, newer: pd.DataFrame) -> np.ndarray:
+    """
+    Boolean mask over `existing` marking rows replaced by a row of `newer` for
+    the same employee_id and calendar day. Rows without a parseable date are
+    never considered duplicates.
+    """
+    if existing.empty or newer.empty:
+        return np.zeros(len(existing), dtype=bool)
+    new_days = day_numbers(newer["date"])
+    # Only rows sharing an employee and a day with the batch can be superseded
+    new_ids = {str(value) for value in pd.unique(newer["employee_id"])}
+    existing_ids = existing["employee_id"]
+    matching_ids = [value for value in existing_ids.unique() if str(value) in new_ids]
+    existing_days = existing["day_key"].to_numpy() if "day_key" in existing.columns else day_numbers(existing["date"])
+    candidates = existing_ids.isin(matching_ids).to_numpy()
+    candidates &= np.isin(existing_days, new_days) & (existing_days != MISSING_KEY)
+    mask = np.zeros(len(existing), dtype=bool)
+    if candidates.any():
+        candidate_keys, new_keys = employee_day_keys(
+            existing_ids[candidates], existing_days[candidates], newer["employee_id"], new_days
+        )
+        mask[candidates] = np.isin(candidate_keys, new_keys)
+    return mask
@@ -0,0 +1,293 @@
+"""Load-testing harness for the HR Analytics API.
+
+Drives `src.hr_analysis.api.main:app` either in-process through an ASGI client
+or over HTTP against a running uvicorn, with a weighted mix of report requests
+and randomly drawn parameters, at one or more concurrency levels. For every
+level it reports throughput, p50/p95/p99 latency and error rate per endpoint and
+writes a JSON summary that can be compared between releases.
+
+Every level replays the same seeded request sequence. In-process, each level
+starts cold by default: the response cache and single-flight counters are reset
+first, so later levels do not just measure cache hits left by earlier ones. With
+--cache warm the cache is kept across levels. Against a running server the
+harness cannot reset its cache, so start the server fresh for cold numbers.
+
+Usage:
+    python -m src.hr_analysis.loadtest --synthetic --concurrency 1 8 32 --requests 2000
+    python -m src.hr_analysis.loadtest --base-url http://localhost:10000 --duration 30
+    python -m src.hr_analysis.loadtest --synthetic --mix mix.json --output summary.json
+
+A mix file is a JSON list of scenarios:
+    [{"name": "department-overtime", "path": "/reports/department-overtime",
+      "weight": 3, "params": {"start_date": ["2025-01-01", "2025-02-01"], "end_date": [null]}}]
+Each parameter value is drawn uniformly from its list; null leaves it out, and a
+list value is sent as a repeated parameter (e.g. employee_ids).
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import tempfile
+import time
+from datetime import (
+    datetime,
+    timezone,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+import numpy as np
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+MONTH_STARTS = ["2025-01-01", "2025-02-01", "2025-03-01"]
+MONTH_ENDS = ["2025-01-31", "2025-02-28", "2025-03-31"]
+DEPARTMENTS = [None, "Engineering", "Finance", "Human Resource", "Marketing"]
+
+# Response cache handling between concurrency levels (in-process only)
+COLD = "cold"
+WARM = "warm"
+
+# Default request mix, matching the synthetic dataset (Q1 2025, 4 departments)
+DEFAULT_MIX: List[Dict[str, Any]] = [
+    {"name": "department-overtime", "path": "/reports/department-overtime", "weight": 4,
+     "params": {"start_date": MONTH_STARTS, "end_date": MONTH_ENDS}},
+    {"name": "overtime-trends", "path": "/reports/overtime-trends", "weight": 3,
+     "params": {"start_date": MONTH_STARTS, "department": DEPARTMENTS, "granularity": ["daily", "weekly", "monthly"]}},
+    {"name": "top-overtime-employees", "path": "/reports/top-overtime-employees", "weight": 2,
+     "params": {"start_date": MONTH_STARTS, "department": DEPARTMENTS, "top_n": [5, 10]}},
+    {"name": "overtime-month-comparison", "path": "/reports/overtime-month-comparison", "weight": 1,
+     "params": {"department": DEPARTMENTS}},
+    {"name": "overtime-weekly-summary", "path": "/reports/overtime-weekly-summary", "weight": 1,
+     "params": {"start_date": MONTH_STARTS, "week_start": ["sunday", "monday"]}},
+    {"name": "attendance", "path": "/reports/attendance", "weight": 1,
+     "params": {"department": DEPARTMENTS[1:], "start_date": MONTH_STARTS, "end_date": MONTH_ENDS}},
+    {"name": "dashboard", "path": "/dashboard", "weight": 1, "params": {}},
+]
+
+
+def draw_params(scenario: Dict[str, Any], rng: random.Random) -> List[tuple]:
+    """Draws one value per parameter of a scenario as (name, value) pairs."""
+    params = []
+    for name, choices in scenario.get("params", {}).items():
+        value = rng.choice(choices)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            params.extend((name, str(item)) for item in value)
+        else:
+            params.append((name, str(value)))
+    return params
+
+
+def latency_stats(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Throughput, error rate and latency percentiles (milliseconds) for one endpoint."""
+    count = len(latencies)
+    stats = {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    if count:
+        p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+        stats.update(
+            {
+                "latency_ms_p50": round(float(p50), 3),
+                "latency_ms_p95": round(float(p95), 3),
+                "latency_ms_p99": round(float(p99), 3),
+                "latency_ms_max": round(max(latencies) * 1000, 3),
+            }
+        )
+    return stats
+
+
+async def _run_level(
+    client: "httpx.AsyncClient",
+    mix: List[Dict[str, Any]],
+    concurrency: int,
+    total_requests: Optional[int],
+    duration: Optional[float],
+    seed: int,
+) -> Dict[str, Any]:
+    """Runs `concurrency` workers until the request budget or the duration is used up."""
+    records: Dict[str, Dict[str, Any]] = {scenario["name"]: {"latencies": [], "errors": 0} for scenario in mix}
+    weights = [scenario.get("weight", 1) for scenario in mix]
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def worker(worker_id: int) -> None:
+        nonlocal issued
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            if total_requests is not None and issued >= total_requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            issued += 1
+            scenario = rng.choices(mix, weights=weights)[0]
+            record = records[scenario["name"]]
+            request_started = time.perf_counter()
+            try:
+                response = await client.get(scenario["path"], params=draw_params(scenario, rng))
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            record["latencies"].append(time.perf_counter() - request_started)
+            record["errors"] += int(failed)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    all_latencies = [latency for record in records.values() for latency in record["latencies"]]
+    return {
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "total": latency_stats(all_latencies, sum(record["errors"] for record in records.values()), elapsed),
+        "endpoints": {
+            name: latency_stats(record["latencies"], record["errors"], elapsed)
+            for name, record in records.items()
+            if record["latencies"]
+        },
+    }
+
+
+async def _run_all(
+    mix: List[Dict[str, Any]],
+    concurrency_levels: List[int],
+    total_requests: Optional[int],
+    duration: Optional[float],
+    base_url: Optional[str],
+    seed: int,
+    cache: str,
+) -> List[Dict[str, Any]]:
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        from src.hr_analysis.api.main import app
+        from src.hr_analysis.api.utils.caching import response_cache
+        from src.hr_analysis.api.utils.single_flight import report_flights
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=60)
+    runs = []
+    async with client:
+        for concurrency in concurrency_levels:
+            if not base_url:
+                if cache == COLD:
+                    response_cache.clear()
+                report_flights.reset_stats()
+            run = await _run_level(client, mix, concurrency, total_requests, duration, seed)
+            if not base_url:
+                # Reports actually computed during this level versus served from a cache or a joined request
+                run["coalescing"] = report_flights.stats()
+            runs.append(run)
+    return runs
+
+
+def run_load_test(
+    mix: Optional[List[Dict[str, Any]]] = None,
+    concurrency_levels: Optional[List[int]] = None,
+    total_requests: Optional[int] = 500,
+    duration: Optional[float] = None,
+    base_url: Optional[str] = None,
+    seed: int = 0,
+    cache: str = COLD,
+) -> Dict[str, Any]:
+    """
+    Runs the load test and returns the summary. Without `base_url` the app is
+    driven in-process against whatever dataset the data layer points at, and
+    `cache` chooses whether each level starts with an empty response cache
+    (cold) or keeps what earlier levels cached (warm).
+    Each concurrency level gets `total_requests` requests, or runs for
+    `duration` seconds when given.
+    """
+    if httpx is None:
+        raise ImportError("The load-test harness needs httpx: pip install httpx")
+    if cache not in (COLD, WARM):
+        raise ValueError(f"cache must be '{COLD}' or '{WARM}', got '{cache}'")
+    mix = mix or DEFAULT_MIX
+    concurrency_levels = concurrency_levels or [1, 8]
+    if duration:
+        total_requests = None
+    runs = asyncio.run(_run_all(mix, concurrency_levels, total_requests, duration, base_url, seed, cache))
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": base_url or "in-process",
+        "python": platform.python_version(),
+        "config": {
+            "concurrency_levels": concurrency_levels,
+            "requests_per_level": total_requests,
+            "duration_seconds": duration,
+            "seed": seed,
+            # The harness does not control the cache of a remote server
+            "cache": None if base_url else cache,
+            "mix": [{"name": s["name"], "path": s["path"], "weight": s.get("weight", 1)} for s in mix],
+        },
+        "runs": runs,
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Plain-text table of a load-test summary."""
+    lines = []
+    for run in summary["runs"]:
+        header = f"concurrency={run['concurrency']}  elapsed={run['elapsed_seconds']}s"
+        if "coalescing" in run:
+            header += f"  computed={run['coalescing']['computations']}"
+        lines.append(header)
+        lines.append(f"  {'endpoint':<28}{'reqs':>7}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err%':>7}")
+        rows = list(run["endpoints"].items()) + [("TOTAL", run["total"])]
+        for name, stats in rows:
+            lines.append(
+                f"  {name:<28}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}"
+                f"{stats.get('latency_ms_p50', 0):>9.1f}{stats.get('latency_ms_p95', 0):>9.1f}"
+                f"{stats.get('latency_ms_p99', 0):>9.1f}{stats['error_rate'] * 100:>7.2f}"
+            )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the HR Analytics API.")
+    parser.add_argument("--base-url", help="Test a running server instead of the in-process app")
+    parser.add_argument("--synthetic", action="store_true", help="Serve synthetic data (in-process only)")
+    parser.add_argument("--employees", type=int, default=200, help="Employees in the synthetic dataset")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--duration", type=float, help="Seconds per concurrency level (overrides --requests)")
+    parser.add_argument("--mix", type=Path, help="JSON file with the request mix")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cache", choices=[COLD, WARM], default=COLD,
+        help="Clear the response cache before each level (cold) or keep it across levels (warm); in-process only",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON summary here")
+    args = parser.parse_args()
+
+    mix = json.loads(args.mix.read_text()) if args.mix else None
+    if args.synthetic:
+        from src.hr_analysis import data_cleaner
+        from src.hr_analysis.synthetic_data import write_cleaned_csv
+
+        data_cleaner.CLEAN_DATA_DIR = Path(tempfile.mkdtemp(prefix="hr_loadtest_"))
+        write_cleaned_csv(data_cleaner.CLEAN_DATA_DIR, n_employees=args.employees)
+        data_cleaner.reset_cache()
+
+    summary = run_load_test(mix, args.concurrency, args.requests, args.duration, args.base_url, args.seed, args.cache)
+    print(format_summary(summary))
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2))
+        print(f"Summary written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Memory compaction for the cleaned HR DataFrame.
+
+`compact_df()` shrinks the frame returned by `get_cleaned_df()`:
+- `date` is parsed once to datetime64 instead of being kept as object strings
+- low-cardinality strings (department, day_type, exception, ...) become categoricals
+- high-cardinality strings become Arrow-backed strings when pyarrow is installed
+- numeric columns are downcast, floats only where the values survive unchanged
+- the `employee_date_id` string index is dropped in favour of a RangeIndex
+
+`memory_report()` compares per-column memory before and after compaction.
+Run `python -m src.hr_analysis.memory_compaction` for a report on the current data.
+"""
+
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    ARROW_STRING_DTYPE = "string[pyarrow_numpy]"
+except ImportError:
+    ARROW_STRING_DTYPE = None
+
+# Columns with fewer distinct values than this share of rows become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def _is_string_column(series: pd.Series) -> bool:
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+
+def _downcast_float(series: pd.Series) -> pd.Series:
+    """Downcast to float32 only when every value round-trips exactly."""
+    downcast = series.astype(np.float32)
+    same = (downcast.astype(np.float64) == series) | series.isna()
+    return downcast if bool(same.all()) else series
+
+
+def compact_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a memory-compacted copy of a cleaned DataFrame with identical values."""
+    df = df.reset_index(drop=True)
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    n_rows = max(len(df), 1)
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if pd.api.types.is_integer_dtype(series.dtype):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series.dtype):
+            df[col] = _downcast_float(series)
+        elif _is_string_column(series):
+            if series.nunique(dropna=True) / n_rows < CATEGORY_MAX_UNIQUE_RATIO:
+                df[col] = series.astype("category")
+            elif ARROW_STRING_DTYPE is not None and pd.api.types.infer_dtype(series, skipna=True) == "string":
+                df[col] = series.astype(ARROW_STRING_DTYPE)
+    return df
+
+
+def concat_compacted(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates compacted DataFrames without losing their dtypes: categoricals
+    get the union of all category sets (kept sorted, so grouping order is
+    unchanged) and string columns keep the first frame's string dtype.
+    """
+    base = frames[0]
+    # Shallow copies: replacing a column below leaves the caller's frames untouched
+    frames = [frame.copy(deep=False) for frame in frames]
+    columns = {col for frame in frames for col in frame.columns}
+    for col in columns:
+        present = [frame for frame in frames if col in frame.columns]
+        dtypes = [frame[col].dtype for frame in present]
+        if any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            values = [
+                pd.Index(frame[col].cat.categories if isinstance(frame[col].dtype, pd.CategoricalDtype) else frame[col].dropna().unique(), dtype=object)
+                for frame in present
+            ]
+            categories = values[0].append(values[1:]).unique().sort_values()
+            for frame in present:
+                if isinstance(frame[col].dtype, pd.CategoricalDtype):
+                    if not frame[col].cat.categories.equals(categories):
+                        frame[col] = frame[col].cat.set_categories(categories)
+                else:
+                    frame[col] = frame[col].astype(object).astype(pd.CategoricalDtype(categories))
+        elif col in base.columns and pd.api.types.is_string_dtype(base[col].dtype) and base[col].dtype != object:
+            for frame in present:
+                frame[col] = frame[col].astype(base[col].dtype)
+    return pd.concat(frames, ignore_index=isinstance(base.index, pd.RangeIndex))
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> Dict[str, Any]:
+    """Per-column memory (bytes, deep) of a DataFrame before and after compaction."""
+    before_usage = before.memory_usage(deep=True)
+    after_usage = after.memory_usage(deep=True)
+    columns: List[Dict[str, Any]] = [
+        {
+            "column": "(index)",
+            "dtype_before": str(before.index.dtype),
+            "dtype_after": str(after.index.dtype),
+            "bytes_before": int(before_usage["Index"]),
+            "bytes_after": int(after_usage["Index"]),
+        }
+    ]
+    # Columns only present after loading (e.g. calendar keys) are listed too
+    all_columns = list(before.columns) + [col for col in after.columns if col not in before.columns]
+    for col in all_columns:
+        columns.append(
+            {
+                "column": col,
+                "dtype_before": str(before[col].dtype) if col in before.columns else None,
+                "dtype_after": str(after[col].dtype) if col in after.columns else None,
+                "bytes_before": int(before_usage[col]) if col in before.columns else 0,
+                "bytes_after": int(after_usage[col]) if col in after.columns else 0,
+            }
+        )
+    total_before = int(before_usage.sum())
+    total_after = int(after_usage.sum())
+    return {
+        "rows": len(after),
+        "columns": columns,
+        "total_bytes_before": total_before,
+        "total_bytes_after": total_after,
+        "saved_ratio": round(1 - total_after / total_before, 4) if total_before else 0.0,
+    }
+
+
+def format_memory_report(report: Dict[str, Any]) -> str:
+    """Render a memory report as a plain-text table."""
+    lines = [f"{'column':<24}{'before':>14}{'after':>14}  dtype"]
+    for entry in report["columns"]:
+        lines.append(
+            f"{entry['column']:<24}{entry['bytes_before']:>14,}{entry['bytes_after']:>14,}"
+            f"  {entry['dtype_before']} -> {entry['dtype_after']}"
+        )
+    lines.append(f"{'total':<24}{report['total_bytes_before']:>14,}{report['total_bytes_after']:>14,}")
+    lines.append(f"rows: {report['rows']:,}  saved: {report['saved_ratio']:.1%}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from src.hr_analysis.data_cleaner import read_cleaned_store
+
+    raw_df = read_cleaned_store()
+    print(format_memory_report(memory_report(raw_df, compact_df(raw_df))))
@@ -0,0 +1,173 @@
+"""Rolling-window overtime policy rules.
+
+Overtime policies are rarely about a single day: "more than 20 hours in any 7
+days", "more than 12 overtime days in any 30 days", "overtime on 6 consecutive
+days". The engine reduces the cleaned data to one overtime value per employee and
+day, sorts it by (employee, day) once, and evaluates every rule over those flat
+arrays with cumulative sums and binary searches, so a year of data for thousands
+of employees is checked without any per-row Python loop.
+
+Overlapping windows that break the same rule are merged, so each violation is
+reported once with the span of days it covers and its worst value.
+"""
+
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+import numpy as np
+import pandas as pd
+
+from src.hr_analysis.calendar_dim import (
+    MISSING_KEY,
+    day_numbers,
+)
+
+ROLLING_HOURS = "rolling_hours"
+ROLLING_DAYS = "rolling_days"
+CONSECUTIVE_DAYS = "consecutive_days"
+
+
+class PolicyRule:
+    """
+    One overtime policy.
+    - rolling_hours: overtime hours in any `window_days` days exceed `limit`.
+    - rolling_days: days with overtime in any `window_days` days exceed `limit`.
+    - consecutive_days: overtime on at least `limit` consecutive calendar days.
+    """
+
+    def __init__(self, kind: str, limit: float, window_days: int = 1):
+        if kind not in (ROLLING_HOURS, ROLLING_DAYS, CONSECUTIVE_DAYS):
+            raise ValueError(f"Unknown overtime policy: {kind}")
+        if window_days < 1:
+            raise ValueError("window_days must be at least 1")
+        self.kind = kind
+        self.limit = limit
+        self.window_days = window_days
+
+    def describe(self) -> str:
+        if self.kind == ROLLING_HOURS:
+            return f"More than {self.limit:g} overtime hours in {self.window_days} days"
+        if self.kind == ROLLING_DAYS:
+            return f"More than {self.limit:g} overtime days in {self.window_days} days"
+        return f"Overtime on {self.limit:g} or more consecutive days"
+
+
+class OvertimeDays:
+    """Overtime per employee and day, sorted by (employee, day); days without overtime are left out."""
+
+    def __init__(self, df: pd.DataFrame):
+        days = df["day_key"].to_numpy() if "day_key" in df.columns else day_numbers(df["date"])
+        hours = pd.to_numeric(df["total_ot"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        employee_ids = df["employee_id"]
+        keep = (hours > 0) & (days != MISSING_KEY) & employee_ids.notna().to_numpy()
+        codes, self.employee_ids = pd.factorize(employee_ids[keep].astype(str), sort=True)
+        days = days[keep].astype(np.int64)
+        hours = hours[keep]
+        departments = (
+            df["department"].astype(object).to_numpy()[keep] if "department" in df.columns else np.full(len(days), None)
+        )
+
+        # Sort once and add up several rows of the same employee and day
+        order = np.lexsort((days, codes))
+        codes, days, hours, departments = codes[order], days[order], hours[order], departments[order]
+        first = np.ones(len(days), dtype=bool)
+        first[1:] = (codes[1:] != codes[:-1]) | (days[1:] != days[:-1])
+        starts = np.flatnonzero(first)
+        self.codes = codes[starts]
+        self.days = days[starts]
+        self.hours = np.add.reduceat(hours, starts) if len(starts) else hours
+        self.departments = departments[starts]
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def window_starts(self, window_days: int) -> np.ndarray:
+        """Position of the first overtime day inside the window ending at each day."""
+        if not len(self):
+            return np.zeros(0, dtype=np.int64)
+        # Composite key that keeps employees apart and is sorted like the arrays
+        base = self.days.min() - window_days
+        stride = self.days.max() - base + 1
+        keys = self.codes.astype(np.int64) * stride + (self.days - base)
+        return np.searchsorted(keys, keys - (window_days - 1), side="left")
+
+
+def _windowed_totals(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Sum of values[starts[i]:i + 1] for every i."""
+    cumulative = np.concatenate([[0.0], np.cumsum(values)])
+    return cumulative[np.arange(1, len(values) + 1)] - cumulative[starts]
+
+
+def _merge_runs(
+    data: OvertimeDays,
+    rule: PolicyRule,
+    violating: np.ndarray,
+    run_starts: np.ndarray,
+    values: np.ndarray,
+) -> List[Dict[str, Any]]:
+    """
+    Collapses violating windows ending at the positions in `violating` into one
+    entry per overlapping run. `run_starts` holds the first day position of each window.
+    """
+    if not len(violating):
+        return []
+    codes = data.codes[violating]
+    window_first_days = data.days[run_starts[violating]]
+    ends = data.days[violating]
+    new_run = np.ones(len(violating), dtype=bool)
+    new_run[1:] = (codes[1:] != codes[:-1]) | (window_first_days[1:] > ends[:-1])
+    first = np.flatnonzero(new_run)
+    last = np.append(first[1:], len(violating)) - 1
+    worst = np.maximum.reduceat(values[violating], first)
+    start_labels = pd.DatetimeIndex(window_first_days[first].astype("datetime64[D]")).strftime("%Y-%m-%d")
+    end_labels = pd.DatetimeIndex(ends[last].astype("datetime64[D]")).strftime("%Y-%m-%d")
+    reason = rule.describe()
+    return [
+        {
+            "employee_id": employee_id,
+            "department": department,
+            "policy": rule.kind,
+            "window_start": start,
+            "window_end": end,
+            "value": float(value),
+            "limit": float(rule.limit),
+            "exception_reason": reason,
+        }
+        for employee_id, department, start, end, value in zip(
+            data.employee_ids[codes[first]], data.departments[violating][last], start_labels, end_labels, worst
+        )
+    ]
+
+
+def evaluate_rule(data: OvertimeDays, rule: PolicyRule) -> List[Dict[str, Any]]:
+    """Violations of one rule, ordered by employee and window start."""
+    if not len(data):
+        return []
+    if rule.kind == CONSECUTIVE_DAYS:
+        # A streak breaks when the employee changes or a calendar day is skipped
+        breaks = np.ones(len(data), dtype=bool)
+        breaks[1:] = (data.codes[1:] != data.codes[:-1]) | (data.days[1:] != data.days[:-1] + 1)
+        streak_starts = np.flatnonzero(breaks)[np.cumsum(breaks) - 1]
+        lengths = np.arange(len(data)) - streak_starts + 1
+        violating = np.flatnonzero(lengths >= rule.limit)
+        return _merge_runs(data, rule, violating, streak_starts, lengths.astype(float))
+
+    starts = data.window_starts(rule.window_days)
+    values = data.hours if rule.kind == ROLLING_HOURS else np.ones(len(data))
+    totals = _windowed_totals(values, starts)
+    violating = np.flatnonzero(totals > rule.limit)
+    return _merge_runs(data, rule, violating, starts, totals)
+
+
+def evaluate_policies(df: pd.DataFrame, rules: List[PolicyRule]) -> List[Dict[str, Any]]:
+    """Violations of every rule over the cleaned rows in `df` (employee_id, date/day_key, total_ot)."""
+    if not rules or df.empty or "total_ot" not in df.columns:
+        return []
+    data = OvertimeDays(df)
+    violations = []
+    for rule in rules:
+        violations.extend(evaluate_rule(data, rule))
+    return violations
@@ -0,0 +1,145 @@
+"""Month-partitioned layout of the cleaned dataset.
+
+`clean_all_csvs(partition_by_month=True)` writes one CSV per calendar month to
+clean_data/partitions/ plus a small catalog.json holding each partition's month,
+min/max date and row count. The data layer reads the catalog and only loads the
+partitions overlapping a query's date range, so the cost of a monthly report
+does not grow with the amount of history kept.
+
+Rows whose date cannot be parsed go to an "unknown" partition, which is only
+read by queries without a date range.
+
+Every row keeps its position in the cleaned output in a row_order column, and
+rows merged in later (delta compaction) are numbered after all existing ones, so
+a frame composed of several partitions can be put back in the same row order as
+the single-file cleaned.csv store. Catalogs written before this column existed
+have no max_row_order; their partitions are composed in month order.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+import numpy as np
+import pandas as pd
+
+PARTITION_DIR_NAME = "partitions"
+CATALOG_NAME = "catalog.json"
+UNKNOWN_PARTITION = "unknown"
+# Position of a row in the cleaned output, stored with every partitioned row
+ROW_ORDER_COLUMN = "row_order"
+
+
+def partition_dir(clean_dir: Path) -> Path:
+    return clean_dir / PARTITION_DIR_NAME
+
+
+def catalog_path(clean_dir: Path) -> Path:
+    return partition_dir(clean_dir) / CATALOG_NAME
+
+
+def partition_names(dates: pd.Series) -> np.ndarray:
+    """Partition name ("YYYY-MM" or "unknown") for every value of a date column."""
+    parsed = pd.to_datetime(dates, errors="coerce")
+    names = parsed.dt.strftime("%Y-%m").to_numpy(dtype=object)
+    names[parsed.isna().to_numpy()] = UNKNOWN_PARTITION
+    return names
+
+
+def partition_entry(name: str, df: pd.DataFrame) -> Dict[str, Any]:
+    """Catalog entry describing the rows of one partition."""
+    dates = pd.to_datetime(df["date"], errors="coerce").dropna() if "date" in df.columns else pd.Series([], dtype="datetime64[ns]")
+    return {
+        "name": name,
+        "file": f"month={name}.csv",
+        "month": name,
+        "min_date": dates.min().strftime("%Y-%m-%d") if len(dates) else None,
+        "max_date": dates.max().strftime("%Y-%m-%d") if len(dates) else None,
+        "rows": int(len(df)),
+        "max_row_order": int(df[ROW_ORDER_COLUMN].max()) if ROW_ORDER_COLUMN in df.columns and len(df) else None,
+    }
+
+
+def write_partition(clean_dir: Path, name: str, df: pd.DataFrame) -> Dict[str, Any]:
+    """Writes one partition file atomically and returns its catalog entry."""
+    directory = partition_dir(clean_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    entry = partition_entry(name, df)
+    path = directory / entry["file"]
+    tmp_path = path.with_suffix(".tmp")
+    df.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+    return entry
+
+
+def write_catalog(clean_dir: Path, entries: List[Dict[str, Any]]) -> None:
+    path = catalog_path(clean_dir)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"partitions": sorted(entries, key=lambda e: e["name"])}, indent=2))
+    os.replace(tmp_path, path)
+
+
+def read_catalog(clean_dir: Path) -> Optional[List[Dict[str, Any]]]:
+    """Partition entries, or None when the cleaned store is not partitioned."""
+    path = catalog_path(clean_dir)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())["partitions"]
+
+
+def write_partitions(clean_dir: Path, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Splits a cleaned DataFrame by month, writes every partition and the catalog."""
+    df = df.assign(**{ROW_ORDER_COLUMN: np.arange(len(df))})
+    names = partition_names(df["date"])
+    entries = [write_partition(clean_dir, name, part) for name, part in df.groupby(names, sort=True)]
+    # Drop partition files of months no longer present
+    keep = {entry["file"] for entry in entries}
+    for path in partition_dir(clean_dir).glob("month=*.csv"):
+        if path.name not in keep:
+            path.unlink()
+    write_catalog(clean_dir, entries)
+    return entries
+
+
+def read_partition(clean_dir: Path, entry: Dict[str, Any]) -> pd.DataFrame:
+    return pd.read_csv(partition_dir(clean_dir) / entry["file"], index_col=0)
+
+
+def next_row_order(entries: List[Dict[str, Any]]) -> Optional[int]:
+    """The row_order for the next row merged into the store, or None for a catalog without row order."""
+    if any("max_row_order" not in entry for entry in entries):
+        return None
+    return max((entry["max_row_order"] for entry in entries if entry["max_row_order"] is not None), default=-1) + 1
+
+
+def in_row_order(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows of partitions concatenated in any order, back in cleaned-output order when row_order is present."""
+    if ROW_ORDER_COLUMN not in df.columns or df[ROW_ORDER_COLUMN].isna().any():
+        return df
+    ordered = df.sort_values(ROW_ORDER_COLUMN, kind="stable")
+    return ordered.reset_index(drop=True) if isinstance(df.index, pd.RangeIndex) else ordered
+
+
+def overlapping(entries: List[Dict[str, Any]], start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> List[Dict[str, Any]]:
+    """
+    Entries whose [min_date, max_date] overlaps [start, end]; either bound may be
+    None. Entries without dates (the unknown partition) only match open queries.
+    """
+    if start is None and end is None:
+        return list(entries)
+    selected = []
+    for entry in entries:
+        if entry["min_date"] is None or entry["max_date"] is None:
+            continue
+        if end is not None and pd.Timestamp(entry["min_date"]) > end:
+            continue
+        if start is not None and pd.Timestamp(entry["max_date"]) < start:
+            continue
+        selected.append(entry)
+    return selected
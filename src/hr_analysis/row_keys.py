@@ -0,0 +1,75 @@
+"""Integer row keys for deduplicating attendance rows.
+
+A row is identified by its employee and its date. Instead of concatenating
+`employee_id + "_" + date` into a string for every row, both columns are
+factorized into small integer codes and combined into one int64 key per row,
+which dedup and lookups hash and compare far faster and in a fraction of the
+memory. Values compare the way `Series.astype(str)` of their own column renders
+them, per source column and before any concatenation could coerce dtypes (an int
+101 in one file and a float 101.0 in another stay apart, as "101" and "101.0"),
+so the keys identify the same rows as the string IDs they replace. The
+human-readable employee_date_id is only built for rows that are written out.
+"""
+
+from typing import (
+    List,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+
+def _column_strings(column: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Codes of the distinct values of one column, and each distinct value as astype(str) renders it."""
+    if column.dtype == object and pd.api.types.infer_dtype(column, skipna=False) != "string":
+        # Mixed objects: factorize would treat 101, 101.0 and True == 1 as equal
+        column = column.astype(str)
+    raw_codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    # Only the distinct values are converted; formatting depends on the column dtype only
+    return raw_codes, pd.Index(pd.Series(uniques, dtype=column.dtype).astype(str).to_numpy(), dtype=object)
+
+
+def string_codes(*columns: pd.Series) -> Tuple[List[np.ndarray], int]:
+    """
+    Integer codes shared by all `columns`, equal exactly when the values render
+    equal under astype(str) of their own column (NaN included, as "nan").
+    Returns the codes per column and the number of distinct values.
+    """
+    raw_codes, strings = zip(*(_column_strings(column) for column in columns))
+    string_of_unique, distinct = pd.factorize(pd.Index(np.concatenate([s.to_numpy() for s in strings]), dtype=object))
+    offsets = np.cumsum([0] + [len(s) for s in strings])
+    codes = [string_of_unique[offset + raw].astype(np.int64) for offset, raw in zip(offsets, raw_codes)]
+    return codes, len(distinct)
+
+
+def employee_date_keys(employee_ids: Sequence[pd.Series], dates: Sequence[pd.Series]) -> np.ndarray:
+    """
+    One int64 key per row of the given columns, taken in order (typically one
+    pair per source frame), equal exactly when employee_id and date both render
+    equal as strings.
+    """
+    employee_codes, _ = string_codes(*employee_ids)
+    date_codes, n_dates = string_codes(*dates)
+    return np.concatenate(employee_codes) * max(n_dates, 1) + np.concatenate(date_codes)
+
+
+def employee_day_keys(
+    existing_ids: pd.Series,
+    existing_days: np.ndarray,
+    newer_ids: pd.Series,
+    newer_days: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    int64 (employee, calendar day) keys for two sets of rows, comparable with
+    each other. Days are day numbers from calendar_dim.day_numbers().
+    """
+    (existing_codes, newer_codes), _ = string_codes(existing_ids, newer_ids)
+    # Day numbers fit in 32 bits; the offset keeps them (and MISSING_KEY) non-negative
+    offset = np.int64(2**31)
+
+    def combine(codes: np.ndarray, days: np.ndarray) -> np.ndarray:
+        return (codes << np.int64(32)) | (days.astype(np.int64) + offset)
+
+    return combine(existing_codes, existing_days), combine(newer_codes, newer_days)
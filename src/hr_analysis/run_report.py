@@ -0,0 +1,173 @@
+"""Stage timings and memory high-water marks for cleaning runs.
+
+clean_all_csvs() runs every step of the pipeline inside a RunProfiler stage:
+per source file read, column normalization, string strip and date parsing, then
+concat, dedup, duplicate-column removal and write for the merged data. Each stage
+records its wall time and the process RSS high-water mark after it, and with
+memory tracing on also the peak of memory allocated by Python and numpy while it
+ran (tracemalloc). Row and column counts are recorded around dedup.
+
+The run report is written as JSON next to the cleaned output
+(clean_data/cleaning_report.json), and a one-line summary per run is appended to
+clean_data/cleaning_history.jsonl so ingest performance can be compared across
+runs and slow source files stand out. Optionally the whole run is profiled with
+cProfile and the stats dumped next to the report.
+
+tracemalloc slows the cleaning run down several times over, so it is opt-in
+(trace_memory=True, --trace-memory), like the cProfile dump.
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import (
+    datetime,
+    timezone,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+REPORT_NAME = "cleaning_report.json"
+HISTORY_NAME = "cleaning_history.jsonl"
+PROFILE_NAME = "cleaning_profile.prof"
+
+# Stages of the cleaning pipeline, in the order they run
+READ = "read"
+NORMALIZE_COLUMNS = "normalize_columns"
+STRIP = "strip"
+PARSE_DATES = "parse_dates"
+CONCAT = "concat"
+DEDUP = "dedup"
+DROP_DUPLICATE_COLUMNS = "drop_duplicate_columns"
+REPLAY_INGESTED = "replay_ingested"
+WRITE = "write"
+
+
+def max_rss_bytes() -> Optional[int]:
+    """Process resident set size high-water mark so far, or None where unsupported."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss if platform.system() == "Darwin" else max_rss * 1024
+
+
+class RunProfiler:
+    """Collects stage timings, memory peaks and counters of one cleaning run."""
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._owns_tracing = False
+
+    def start(self) -> None:
+        """Starts memory tracing for the run unless it is disabled or already on."""
+        if self.enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+
+    def stop(self) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, source: Optional[str] = None) -> Iterator[None]:
+        """Times the enclosed block as stage `name`, of one source file or of the whole run."""
+        if not self.enabled:
+            yield
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append(
+                {
+                    "stage": name,
+                    "source": source,
+                    "seconds": round(time.perf_counter() - started, 6),
+                    "peak_traced_bytes": tracemalloc.get_traced_memory()[1] if tracing else None,
+                    "max_rss_bytes": max_rss_bytes(),
+                }
+            )
+
+    def count(self, name: str, value: int) -> None:
+        if self.enabled:
+            self.counts[name] = int(value)
+
+    def describe_file(self, source: str, path: Path, df: pd.DataFrame) -> None:
+        """Records size and shape of a source file as read."""
+        if self.enabled:
+            self.files[source] = {"bytes": path.stat().st_size, "rows": len(df), "columns": len(df.columns)}
+
+    def report(self, **details: Any) -> Dict[str, Any]:
+        """The run report: totals per stage, per source file, and every stage run in order."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        per_file: Dict[str, Dict[str, Any]] = {source: dict(info, stages={}) for source, info in self.files.items()}
+        for entry in self.stages:
+            total = totals.setdefault(entry["stage"], {"seconds": 0.0, "peak_traced_bytes": None})
+            total["seconds"] = round(total["seconds"] + entry["seconds"], 6)
+            if entry["peak_traced_bytes"] is not None:
+                total["peak_traced_bytes"] = max(total["peak_traced_bytes"] or 0, entry["peak_traced_bytes"])
+            if entry["source"] is not None:
+                file_info = per_file.setdefault(entry["source"], {"stages": {}})
+                file_info["stages"][entry["stage"]] = {
+                    "seconds": entry["seconds"],
+                    "peak_traced_bytes": entry["peak_traced_bytes"],
+                }
+        for file_info in per_file.values():
+            file_info["seconds"] = round(sum(stage["seconds"] for stage in file_info["stages"].values()), 6)
+        return {
+            "started_at": self.started_at.isoformat(),
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "max_rss_bytes": max_rss_bytes(),
+            "memory_traced": self.trace_memory,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            **details,
+            "counts": self.counts,
+            "stage_totals": totals,
+            "files": per_file,
+            "stages": self.stages,
+        }
+
+
+def write_run_report(report: Dict[str, Any], directory: Path) -> Path:
+    """Writes the report to `directory` and appends its summary to the run history."""
+    report_path = directory / REPORT_NAME
+    report_path.write_text(json.dumps(report, indent=2))
+    summary = {
+        "started_at": report["started_at"],
+        "total_seconds": report["total_seconds"],
+        "max_rss_bytes": report["max_rss_bytes"],
+        "counts": report["counts"],
+        "stage_seconds": {stage: total["seconds"] for stage, total in report["stage_totals"].items()},
+        "file_seconds": {source: info["seconds"] for source, info in report["files"].items()},
+    }
+    with open(directory / HISTORY_NAME, "a") as history:
+        history.write(json.dumps(summary) + "\n")
+    return report_path
@@ -0,0 +1,168 @@
+"""Optional DuckDB compute backend for the overtime reports.
+
+With HR_ANALYSIS_BACKEND=duckdb the overtime aggregation reports run their
+filter + group-by as one SQL query in an embedded, in-process DuckDB instead of
+a chain of pandas boolean masks that materializes a new frame at every step.
+DuckDB scans the cached cleaned DataFrame in place (only the referenced columns)
+and applies the filters during the scan. Row counts are aggregated in SQL; overtime
+hours are summed by pandas over the selected rows, because a float sum depends on
+the order its values are added in and DuckDB's parallel SUM would differ from the
+pandas result in the last digits.
+
+The query runs over the frame returned by get_cleaned_df(), not the files on
+disk, so partition pruning, pending delta segments and dedup behave exactly as on
+the pandas path. It returns the same summary frame the pandas code builds (group
+columns sorted like groupby, plus total_ot or total_overtime_hours), and the
+report keeps building its response from that frame, so both backends produce
+identical responses. The parity suite in tests/unit_tests/test_sql_backend.py
+checks this.
+
+DuckDB is an optional dependency: pip install duckdb. It is only imported when
+the first query runs, so the default pandas backend never loads it.
+"""
+
+import importlib.util
+import os
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+)
+
+import pandas as pd
+
+from src.hr_analysis.calendar_dim import MISSING_KEY
+
+if TYPE_CHECKING:
+    import duckdb
+
+BACKEND_ENV_VAR = "HR_ANALYSIS_BACKEND"
+PANDAS_BACKEND = "pandas"
+DUCKDB_BACKEND = "duckdb"
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def sql_backend_enabled() -> bool:
+    """True when HR_ANALYSIS_BACKEND selects DuckDB; fails loudly if it is not installed."""
+    backend = os.environ.get(BACKEND_ENV_VAR, PANDAS_BACKEND).lower()
+    if backend not in (PANDAS_BACKEND, DUCKDB_BACKEND):
+        raise ValueError(f"{BACKEND_ENV_VAR} must be '{PANDAS_BACKEND}' or '{DUCKDB_BACKEND}', got '{backend}'")
+    if backend == DUCKDB_BACKEND and importlib.util.find_spec("duckdb") is None:
+        raise ImportError(f"{BACKEND_ENV_VAR}=duckdb needs the duckdb package: pip install duckdb")
+    return backend == DUCKDB_BACKEND
+
+
+def _cursor() -> "duckdb.DuckDBPyConnection":
+    """A cursor on the shared in-memory database; each thread gets its own."""
+    global _connection
+    import duckdb
+
+    with _connection_lock:
+        if _connection is None:
+            # Unordered selections must keep the frame's row order (see overtime_totals)
+            _connection = duckdb.connect(":memory:", config={"preserve_insertion_order": True})
+    return _connection.cursor()
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _string_match(
+    df: pd.DataFrame, column: str, accept: Callable[[str], bool], fallback: str, fallback_params: List[Any]
+) -> Tuple[str, List[Any]]:
+    """
+    SQL condition keeping rows whose `column` value is accepted. Categorical
+    columns are resolved against their categories here, so the scan compares
+    dictionary codes instead of casting every row to a string.
+    """
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = [value for value in series.cat.categories if accept(str(value))]
+        if not values:
+            return "FALSE", []
+        return f"{_quote(column)} IN ({', '.join('?' * len(values))})", values
+    return fallback, fallback_params
+
+
+def overtime_totals(
+    df: pd.DataFrame,
+    group_cols: List[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    employee_ids: Optional[List[str]] = None,
+    overtime_only: bool = False,
+    period_key: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Overtime per group of `group_cols` over the rows of `df` matching the filters,
+    mirroring the pandas report pipeline:
+    - date range on the parsed date (unparseable dates only pass open ranges)
+    - department compared case-insensitively, employee_id(s) exactly
+    - overtime_only keeps rows with total_ot > 0; period_key drops rows without a period
+    - groups with a missing key are dropped, groups are sorted by key
+    Returns the group columns plus total_ot (summed), or total_overtime_hours
+    (row count) when the data has no total_ot column.
+    """
+    conditions: List[str] = []
+    params: List[Any] = []
+    if start_date:
+        conditions.append('TRY_CAST("date" AS TIMESTAMP) >= ?')
+        params.append(pd.to_datetime(start_date).to_pydatetime())
+    if end_date:
+        conditions.append('TRY_CAST("date" AS TIMESTAMP) <= ?')
+        params.append(pd.to_datetime(end_date).to_pydatetime())
+    filters = []
+    if department and "department" in df.columns:
+        wanted = department.lower()
+        fallback = 'lower(CAST("department" AS VARCHAR)) = ?'
+        filters.append(_string_match(df, "department", lambda value: value.lower() == wanted, fallback, [wanted]))
+    if employee_id:
+        fallback = 'CAST("employee_id" AS VARCHAR) = ?'
+        filters.append(_string_match(df, "employee_id", lambda value: value == employee_id, fallback, [employee_id]))
+    if employee_ids:
+        wanted_ids = set(employee_ids)
+        fallback = 'list_contains(?, CAST("employee_id" AS VARCHAR))'
+        filters.append(
+            _string_match(df, "employee_id", lambda value: value in wanted_ids, fallback, [list(employee_ids)])
+        )
+    for condition, values in filters:
+        conditions.append(condition)
+        params.extend(values)
+    has_total_ot = "total_ot" in df.columns
+    if overtime_only and has_total_ot:
+        conditions.append('"total_ot" > 0')
+    if period_key:
+        conditions.append(f"{_quote(period_key)} <> {MISSING_KEY}")
+    conditions.extend(f"{_quote(col)} IS NOT NULL" for col in group_cols)
+
+    keys = ", ".join(_quote(col) for col in group_cols)
+    where = " AND ".join(conditions)
+    if has_total_ot:
+        # Float sums depend on the order values are added in, so DuckDB only
+        # selects the matching rows (in frame order) and pandas sums them exactly
+        # like the pandas path does
+        query = f'SELECT {keys}, "total_ot" FROM cleaned WHERE {where}'
+    else:
+        query = (
+            f"SELECT {keys}, COUNT(*) AS total_overtime_hours FROM cleaned WHERE {where} "
+            f"GROUP BY {keys} ORDER BY {keys}"
+        )
+    cursor = _cursor()
+    try:
+        cursor.register("cleaned", df)
+        result = cursor.execute(query, params).df()
+    finally:
+        cursor.close()
+    if has_total_ot:
+        result["total_ot"] = result["total_ot"].astype(df["total_ot"].dtype)
+        return result.groupby(group_cols, observed=True)["total_ot"].sum().reset_index()
+    return result
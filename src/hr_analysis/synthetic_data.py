@@ -0,0 +1,51 @@
+"""Synthetic attendance data shaped like clean_data/cleaned.csv.
+
+Used by the test fixtures and the load-test harness, so both run offline
+without real HR data.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEPARTMENTS = ["Engineering", "Finance", "Human Resource", "Marketing"]
+
+
+def make_cleaned_df(
+    n_employees: int = 12, start: str = "2025-01-01", end: str = "2025-03-31", seed: int = 7, fractional: bool = False
+) -> pd.DataFrame:
+    """
+    One row per employee and day, indexed by employee_date_id like clean_all_csvs() output.
+    Overtime is whole hours, or tenths of an hour with `fractional`.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, end, freq="D")
+    n_days = len(dates)
+    employee_ids = np.array([f"A{10001 + i}" for i in range(n_employees)])
+    departments = np.array([DEPARTMENTS[i % len(DEPARTMENTS)] for i in range(n_employees)])
+    n_rows = n_employees * n_days
+    has_ot = rng.random(n_rows) < 0.4
+    weekend = np.tile(dates.weekday >= 5, n_employees)
+    exception = np.where(rng.random(n_rows) < 0.1, "Lateness", None)
+    hours = rng.integers(10, 90, n_rows) / 10 if fractional else rng.integers(1, 9, n_rows)
+    df = pd.DataFrame(
+        {
+            "employee_id": np.repeat(employee_ids, n_days),
+            "date": np.tile(dates.strftime("%Y-%m-%d").to_numpy(), n_employees),
+            "department": np.repeat(departments, n_days),
+            "day_type": np.where(weekend, "Weekend", "Working Day"),
+            "exception": exception,
+            "total_ot": np.where(has_ot, hours, 0).astype(float),
+        }
+    )
+    df["employee_date_id"] = df["employee_id"] + "_" + df["date"]
+    return df.set_index("employee_date_id")
+
+
+def write_cleaned_csv(clean_dir: Path, **kwargs) -> Path:
+    """Writes a synthetic cleaned.csv into `clean_dir` and returns its path."""
+    clean_dir.mkdir(parents=True, exist_ok=True)
+    path = clean_dir / "cleaned.csv"
+    make_cleaned_df(**kwargs).to_csv(path)
+    return path
@@ -18,4 +18,5 @@ sys.path.insert(0, str(TESTS_DIR_PARENT))
 pytest_plugins = [
     # e.g. "tests/fixtures/example_fixture.py" should be registered as:
     "tests.fixtures.example_fixture",
+    "tests.fixtures.hr_data",
 ]
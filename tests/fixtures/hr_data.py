@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import pytest
+
+from src.hr_analysis import data_cleaner
+from src.hr_analysis.synthetic_data import make_cleaned_df
+
+
+def reset_data_cache() -> None:
+    data_cleaner.reset_cache()
+
+
+@pytest.fixture
+def clean_data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the data layer at a temporary clean_data/ holding a synthetic cleaned.csv."""
+    clean_dir = tmp_path / "clean_data"
+    clean_dir.mkdir()
+    make_cleaned_df().to_csv(clean_dir / data_cleaner.CLEANED_CSV_NAME)
+    monkeypatch.setattr(data_cleaner, "CLEAN_DATA_DIR", clean_dir)
+    monkeypatch.setattr(data_cleaner, "UNCLEAN_DATA_DIR", tmp_path / "unclean_data")
+    reset_data_cache()
+    yield clean_dir
+    reset_data_cache()
@@ -0,0 +1,103 @@
+"""Tests for `hr_analysis.api.utils.caching`."""
+
+import gzip
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.hr_analysis import data_cleaner
+from src.hr_analysis.api.main import app
+from src.hr_analysis.api.utils import caching
+
+
+@pytest.fixture
+def client(clean_data_dir) -> TestClient:
+    caching.response_cache.clear()
+    yield TestClient(app)
+    caching.response_cache.clear()
+
+
+def test__report_response_has_etag_and_304_on_match(client: TestClient):
+    """A repeated poll with If-None-Match gets a 304 without running the report."""
+    first = client.get("/reports/department-overtime", params={"start_date": "2025-02-01"})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get(
+        "/reports/department-overtime",
+        params={"start_date": "2025-02-01"},
+        headers={"If-None-Match": etag},
+    )
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test__etag_ignores_query_parameter_order(client: TestClient):
+    """Equivalent queries share an ETag."""
+    a = client.get("/reports/overtime-trends?start_date=2025-01-01&end_date=2025-01-31")
+    b = client.get("/reports/overtime-trends?end_date=2025-01-31&start_date=2025-01-01&department=")
+    assert a.headers["etag"] == b.headers["etag"]
+
+
+def test__etag_changes_with_dataset_version(client: TestClient, clean_data_dir):
+    """Rewriting cleaned.csv invalidates previously issued ETags."""
+    etag = client.get("/reports/departments").headers["etag"]
+    cleaned_path = clean_data_dir / data_cleaner.CLEANED_CSV_NAME
+    stat = cleaned_path.stat()
+    os.utime(cleaned_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    response = client.get("/reports/departments", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test__large_bodies_are_gzipped_and_cached(client: TestClient):
+    """Large bodies are compressed when the client accepts gzip, and the bytes are reused."""
+    plain = client.get("/reports/attendance/all", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    response = client.get("/reports/attendance/all", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == plain.json()
+    entry = caching.response_cache.get(response.headers["etag"])
+    assert entry is not None
+    assert gzip.decompress(entry.gzipped()) == entry.body
+
+
+def test__cache_is_bounded_by_bytes():
+    """Least recently used entries are evicted once the byte budget is exceeded; huge bodies are not kept."""
+    cache = caching.ResponseCache(max_entries=10, max_bytes=250, max_body_bytes=200)
+    for etag in ("a", "b", "c"):
+        cache.put(etag, caching.CachedBody(b"x" * 100, "application/json"))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+    assert cache.nbytes() == 200
+
+    cache.put("huge", caching.CachedBody(b"x" * 201, "application/json"))
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test__oversized_body_is_served_but_not_cached(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(caching.response_cache, "max_body_bytes", 100)
+    response = client.get("/reports/attendance/all")
+    assert response.status_code == 200
+    assert len(response.content) > 100
+    assert caching.response_cache.get(response.headers["etag"]) is None
+
+
+@pytest.mark.parametrize(
+    argnames=("header", "matches"),
+    argvalues=[
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"xyz", W/"abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+        (None, False),
+    ],
+)
+def test__etag_matches(header, matches: bool):
+    """Assert `etag_matches()` performs weak comparison over a header list."""
+    assert caching.etag_matches(header, 'W/"abc"') == matches
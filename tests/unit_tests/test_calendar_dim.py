@@ -0,0 +1,43 @@
+"""Tests for `hr_analysis.calendar_dim`."""
+
+import pandas as pd
+import pytest
+
+from src.hr_analysis.calendar_dim import (
+    MISSING_KEY,
+    PERIOD_LABELS,
+    add_calendar_keys,
+    build_calendar,
+    period_labels,
+)
+
+# Spans two year boundaries, including ISO week 53 and week 1 of the next year
+DATES = pd.Series(pd.date_range("2020-12-20", "2022-01-10", freq="D"))
+
+
+def test__calendar_labels_match_strftime():
+    """Labels equal the strftime formats the reports used to compute per row."""
+    calendar = build_calendar(DATES)
+    week_starts = DATES - pd.to_timedelta((DATES.dt.weekday + 1) % 7, unit="D")
+    assert calendar["day_label"].tolist() == DATES.dt.strftime("%Y-%m-%d").tolist()
+    assert calendar["iso_week_label"].tolist() == DATES.dt.strftime("%Y-W%V").tolist()
+    assert calendar["sunday_week_label"].tolist() == week_starts.dt.strftime("%Y-W%U").tolist()
+    assert calendar["month_label"].tolist() == DATES.dt.strftime("%Y-%m").tolist()
+
+
+@pytest.mark.parametrize("key", list(PERIOD_LABELS))
+def test__keys_map_one_to_one_to_labels_in_the_same_order(key: str):
+    """Each key has exactly one label and sorting keys sorts labels identically."""
+    calendar = build_calendar(DATES)
+    assert calendar.groupby(key)[PERIOD_LABELS[key]].nunique().eq(1).all()
+    labels = period_labels(calendar, key)
+    assert labels.index.is_unique
+    assert labels.sort_index().tolist() == sorted(labels.tolist())
+
+
+def test__add_calendar_keys_marks_unparseable_dates():
+    """Rows without a valid date get MISSING_KEY instead of a period."""
+    df = pd.DataFrame({"date": ["2025-07-01", None, "not a date", "2025-07-06"]})
+    add_calendar_keys(df, build_calendar(df["date"]))
+    assert df["month_key"].tolist() == [202507, MISSING_KEY, MISSING_KEY, 202507]
+    assert df["sunday_week_key"].iloc[3] == df["day_key"].iloc[3]  # 2025-07-06 is a Sunday
@@ -0,0 +1,111 @@
+"""Tests for `hr_analysis.delta_log` and online ingestion."""
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.hr_analysis import (
+    data_cleaner,
+    delta_log,
+)
+from src.hr_analysis.api.main import app
+from tests.fixtures.hr_data import reset_data_cache
+
+# Raw batch using column-name variants and a non-ISO date format
+BATCH_CSV = b"""Emp Code,Date Of Attendance,Department,Day Type,Exception,Total OT
+A10001 ,05/01/2025,Engineering,Working Day,,99
+A10001,01/04/2025,Engineering,Working Day,,3
+"""
+
+
+def _employee_rows(df: pd.DataFrame, employee_id: str, date: str) -> pd.DataFrame:
+    df = df.assign(date=pd.to_datetime(df["date"]))
+    return df[(df["employee_id"] == employee_id) & (df["date"] == pd.Timestamp(date))]
+
+
+@pytest.fixture
+def client(clean_data_dir) -> TestClient:
+    return TestClient(app)
+
+
+def test__ingested_batch_is_visible_and_replaces_same_day(client: TestClient, clean_data_dir):
+    """Queries see the batch at once, and it supersedes the base row for that employee and day."""
+    rows_before = len(data_cleaner.get_cleaned_df())
+    version_before = data_cleaner.get_dataset_version()
+
+    response = client.post("/dataset/ingest", content=BATCH_CSV, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["pending_segments"] == 1
+    assert len(delta_log.list_segments(clean_data_dir)) == 1
+
+    df = data_cleaner.get_cleaned_df()
+    assert len(df) == rows_before + 1
+    replaced = _employee_rows(df, "A10001", "2025-01-05")
+    assert replaced["total_ot"].tolist() == [99.0]
+    assert data_cleaner.get_dataset_version() != version_before
+
+    trends = client.get("/reports/overtime-trends", params={"employee_id": "A10001", "start_date": "2025-04-01"})
+    assert trends.json()["overtime_trends"] == [
+        {"date": "2025-04-01", "total_overtime_hours": 3.0, "employee_id": "A10001"}
+    ]
+
+
+def test__compaction_folds_segments_into_base(client: TestClient, clean_data_dir):
+    """Compaction rewrites cleaned.csv with the deltas applied and removes the segments."""
+    client.post("/dataset/ingest", content=BATCH_CSV)
+    in_memory = data_cleaner.get_cleaned_df()
+
+    assert client.post("/dataset/compact").json()["merged_segments"] == 1
+    assert delta_log.list_segments(clean_data_dir) == []
+    assert len(delta_log.list_archived_segments(clean_data_dir)) == 1
+    # The cached frame is adopted as-is instead of being reloaded
+    assert data_cleaner.get_cleaned_df() is in_memory
+
+    reset_data_cache()
+    reloaded = data_cleaner.get_cleaned_df()
+    assert len(reloaded) == len(in_memory)
+    assert _employee_rows(reloaded, "A10001", "2025-01-05")["total_ot"].tolist() == [99.0]
+
+
+def test__batch_without_required_columns_is_rejected(client: TestClient, clean_data_dir):
+    """A batch that cannot be keyed by employee and day is refused with a 400."""
+    response = client.post("/dataset/ingest", content=b"department,total_ot\nFinance,2\n")
+    assert response.status_code == 400
+    assert "employee_id" in response.json()["detail"]
+    assert delta_log.list_segments(clean_data_dir) == []
+
+
+def test__clean_all_csvs_uses_the_same_cleaning_rules(clean_data_dir):
+    """clean_all_csvs() maps column variants and parses dates like ingestion does."""
+    data_cleaner.UNCLEAN_DATA_DIR.mkdir()
+    (data_cleaner.UNCLEAN_DATA_DIR / "attendance.csv").write_bytes(BATCH_CSV)
+    data_cleaner.clean_all_csvs()
+
+    cleaned = data_cleaner.read_cleaned_store()
+    assert list(cleaned.index) == ["A10001_2025-01-05", "A10001_2025-04-01"]
+    assert {"employee_id", "date", "department", "total_ot"} <= set(cleaned.columns)
+
+
+def test__rebuild_after_compaction_keeps_ingested_rows(clean_data_dir):
+    """clean_all_csvs() replays compacted batches, which are not in unclean_data, on top of the rebuild."""
+    data_cleaner.UNCLEAN_DATA_DIR.mkdir()
+    (data_cleaner.UNCLEAN_DATA_DIR / "a.csv").write_text("employee_id,date,total_ot\nA1,2025-07-01,1\n")
+    data_cleaner.clean_all_csvs()
+    reset_data_cache()
+    data_cleaner.ingest_batch(
+        pd.DataFrame({"employee_id": ["A1", "A2"], "date": ["2025-07-01", "2025-07-02"], "total_ot": [5, 2]})
+    )
+    assert data_cleaner.compact_delta_log() == 1
+    data_cleaner.ingest_batch(pd.DataFrame({"employee_id": ["A2"], "date": ["2025-07-02"], "total_ot": [7]}))
+    assert data_cleaner.compact_delta_log() == 1
+
+    data_cleaner.clean_all_csvs()
+    reset_data_cache()
+    rebuilt = data_cleaner.read_cleaned_store().sort_values("employee_id")
+    assert rebuilt["employee_id"].tolist() == ["A1", "A2"]
+    # Later batches still win over earlier ones and over the source files
+    assert rebuilt["total_ot"].tolist() == [5, 7]
+    assert [path.name for path in delta_log.list_archived_segments(clean_data_dir)] == [
+        "delta_00000001.csv",
+        "delta_00000002.csv",
+    ]
@@ -0,0 +1,36 @@
+"""Tests for `hr_analysis.loadtest`."""
+
+import random
+
+from src.hr_analysis import loadtest
+
+
+def test__in_process_run_reports_every_level_without_errors(clean_data_dir):
+    """The default mix runs against the synthetic dataset with no failed requests."""
+    summary = loadtest.run_load_test(concurrency_levels=[1, 4], total_requests=40, seed=1)
+    assert [run["concurrency"] for run in summary["runs"]] == [1, 4]
+    for run in summary["runs"]:
+        assert run["total"]["requests"] == 40
+        assert run["total"]["errors"] == 0
+        assert run["total"]["latency_ms_p50"] <= run["total"]["latency_ms_p99"]
+        assert sum(stats["requests"] for stats in run["endpoints"].values()) == 40
+
+
+def test__levels_start_cold_unless_warm_is_asked_for(clean_data_dir):
+    """Each level replays the same requests; cold levels compute them again, warm ones hit the cache."""
+    cold = loadtest.run_load_test(concurrency_levels=[1, 1], total_requests=30, seed=2)
+    assert cold["config"]["cache"] == loadtest.COLD
+    first, second = (run["coalescing"]["computations"] for run in cold["runs"])
+    assert first == second > 0
+
+    warm = loadtest.run_load_test(concurrency_levels=[1, 1], total_requests=30, seed=2, cache=loadtest.WARM)
+    assert warm["runs"][1]["coalescing"]["computations"] == 0
+
+
+def test__draw_params_skips_none_and_repeats_lists():
+    scenario = {"params": {"department": [None], "employee_ids": [["E1", "E2"]], "top_n": [5]}}
+    assert loadtest.draw_params(scenario, random.Random(0)) == [
+        ("employee_ids", "E1"),
+        ("employee_ids", "E2"),
+        ("top_n", "5"),
+    ]
@@ -0,0 +1,128 @@
+"""Tests for `hr_analysis.api.materialize`."""
+
+import asyncio
+import gzip
+import time
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from src.hr_analysis import data_cleaner
+from src.hr_analysis.api import (
+    materialize,
+    startup,
+)
+from src.hr_analysis.api.main import app
+from src.hr_analysis.api.utils import caching
+
+AS_OF = date(2025, 2, 14)
+
+
+def test__standard_windows():
+    assert materialize.standard_windows(date(2025, 5, 20)) == {
+        "current_month": ("2025-05-01", "2025-05-20"),
+        "last_month": ("2025-04-01", "2025-04-30"),
+        "quarter_to_date": ("2025-04-01", "2025-05-20"),
+        "year_to_date": ("2025-01-01", "2025-05-20"),
+    }
+    assert materialize.standard_windows(date(2025, 1, 3))["last_month"] == ("2024-12-01", "2024-12-31")
+
+
+def test__materialized_bodies_match_live_responses(clean_data_dir, monkeypatch):
+    caching.response_cache.clear()
+    manifest = asyncio.run(materialize.materialize_reports(app, AS_OF))
+    assert manifest["computed"] == len(manifest["entries"]) > 0
+
+    client = TestClient(app)
+    entry = next(entry for entry in manifest["entries"] if entry["path"] == "/reports/overtime-trends")
+    version_dir = clean_data_dir / "materialized" / manifest["dataset_version"]
+    assert (version_dir / materialize.MANIFEST_NAME).exists()
+    stored = gzip.decompress((version_dir / entry["file"]).read_bytes())
+    caching.response_cache.clear()
+    hits = materialize.hits
+    served = client.get(f"{entry['path']}?{entry['query']}")
+    assert served.status_code == 200
+    assert served.content == stored
+    assert materialize.hits == hits + 1
+
+    # The same request computed live gives the same body
+    caching.response_cache.clear()
+    monkeypatch.setattr(materialize, "lookup", lambda *args: None)
+    live = client.get(f"{entry['path']}?{entry['query']}")
+    assert live.content == stored
+
+
+def test__ad_hoc_ranges_fall_back_to_live_computation(clean_data_dir):
+    asyncio.run(materialize.materialize_reports(app, AS_OF))
+    caching.response_cache.clear()
+    misses = materialize.misses
+    response = TestClient(app).get("/reports/department-overtime", params={"start_date": "2025-01-07"})
+    assert response.status_code == 200
+    assert materialize.misses == misses + 1
+
+
+def test__lookups_are_skipped_without_stored_results(clean_data_dir):
+    """Nothing is read or counted for a dataset version that was never materialized."""
+    caching.response_cache.clear()
+    hits, misses = materialize.hits, materialize.misses
+    assert TestClient(app).get("/reports/department-overtime").status_code == 200
+    assert (materialize.hits, materialize.misses) == (hits, misses)
+
+
+def test__startup_without_data_skips_materialization(tmp_path, monkeypatch):
+    """A missing cleaned store keeps the app alive and not ready instead of failing startup."""
+    state = startup.ReadinessState()
+    monkeypatch.setattr(startup, "readiness", state)
+    monkeypatch.setattr("src.hr_analysis.api.main.readiness", state)
+    monkeypatch.setattr(data_cleaner, "CLEAN_DATA_DIR", tmp_path)
+    monkeypatch.setenv(startup.WARMUP_ENV_VAR, "1")
+    monkeypatch.setenv(materialize.MATERIALIZE_ENV_VAR, "1")
+    with TestClient(app) as client:
+        assert client.get("/ready").status_code == 503
+    assert not (tmp_path / materialize.MATERIALIZED_DIR_NAME).exists()
+
+
+def test__second_run_reuses_results_and_new_version_drops_old_ones(clean_data_dir):
+    first = asyncio.run(materialize.materialize_reports(app, AS_OF))
+    again = asyncio.run(materialize.materialize_reports(app, AS_OF))
+    assert again["computed"] == 0
+    assert len(again["entries"]) == len(first["entries"])
+
+    cleaned = data_cleaner.read_cleaned_store()
+    cleaned.iloc[:-1].to_csv(clean_data_dir / data_cleaner.CLEANED_CSV_NAME)
+    data_cleaner.reset_cache()
+    second = asyncio.run(materialize.materialize_reports(app, AS_OF))
+    assert second["dataset_version"] != first["dataset_version"]
+    assert [path.name for path in (clean_data_dir / "materialized").iterdir()] == [second["dataset_version"]]
+
+
+def _wait_for_manifest(clean_data_dir, version: str, timeout: float = 30.0) -> None:
+    manifest_path = clean_data_dir / materialize.MATERIALIZED_DIR_NAME / version / materialize.MANIFEST_NAME
+    deadline = time.monotonic() + timeout
+    while not manifest_path.exists():
+        assert time.monotonic() < deadline, f"no results for {version}"
+        time.sleep(0.05)
+
+
+def test__materializes_in_background_and_again_after_ingest(clean_data_dir, monkeypatch):
+    """Startup does not wait for materialization, and a new dataset version is materialized without a restart."""
+    monkeypatch.setattr(startup, "readiness", startup.ReadinessState())
+    monkeypatch.setattr("src.hr_analysis.api.main.readiness", startup.readiness)
+    monkeypatch.setenv(materialize.MATERIALIZE_ENV_VAR, "1")
+    runs = materialize.materializer.runs
+    with TestClient(app) as client:
+        assert client.get("/ready").status_code == 200
+        first = data_cleaner.get_dataset_version()
+        _wait_for_manifest(clean_data_dir, first)
+
+        batch = "employee_id,date,department,total_ot\nA10001,2025-03-31,Engineering,2.5\n"
+        ingested = client.post("/dataset/ingest", content=batch, headers={"Content-Type": "text/csv"}).json()
+        assert ingested["dataset_version"] != first
+        _wait_for_manifest(clean_data_dir, ingested["dataset_version"])
+        caching.response_cache.clear()
+        hits = materialize.hits
+        window = materialize.standard_windows(date.today())["year_to_date"]
+        params = {"start_date": window[0], "end_date": window[1]}
+        assert client.get("/reports/department-overtime", params=params).status_code == 200
+        assert materialize.hits == hits + 1
+    assert materialize.materializer.runs >= runs + 2
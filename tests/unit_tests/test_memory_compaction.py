@@ -0,0 +1,89 @@
+"""Tests for `hr_analysis.memory_compaction`."""
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.hr_analysis import data_cleaner
+from src.hr_analysis.api.main import app
+from src.hr_analysis.api.utils.caching import response_cache
+from src.hr_analysis.memory_compaction import (
+    compact_df,
+    memory_report,
+)
+from tests.fixtures.hr_data import (
+    make_cleaned_df,
+    reset_data_cache,
+)
+
+REPORT_URLS = [
+    "/reports/departments",
+    "/reports/employees",
+    "/reports/attendance?department=engineering&start_date=2025-02-01",
+    "/reports/attendance/all",
+    "/reports/department-overtime?start_date=2025-03-01",
+    "/reports/top-overtime-employees?top_n=5",
+    "/reports/overtime-trends?granularity=weekly&department=Finance",
+    "/reports/overtime-month-comparison",
+    "/reports/overtime-weekly-summary",
+    "/reports/overtime-employee-comparison?employee_ids=A10001&employee_ids=A10002",
+    "/reports/overtime-exceptions?threshold_hours=6",
+]
+
+
+def test__compact_df_shrinks_memory_and_keeps_values():
+    """Compaction uses smaller dtypes without changing any value."""
+    raw = make_cleaned_df()
+    compact = compact_df(raw)
+    assert isinstance(compact["department"].dtype, pd.CategoricalDtype)
+    assert compact["date"].dtype == "datetime64[ns]"
+    assert compact["total_ot"].dtype == "float32"
+    assert isinstance(compact.index, pd.RangeIndex)
+    assert compact["total_ot"].astype(float).tolist() == raw["total_ot"].tolist()
+
+    report = memory_report(raw, compact)
+    assert report["total_bytes_after"] < report["total_bytes_before"] / 2
+
+
+def test__compact_df_keeps_lossy_floats_as_float64():
+    """Floats that float32 cannot represent exactly are left alone."""
+    df = pd.DataFrame({"total_ot": [0.1, 2.5, None]})
+    assert compact_df(df)["total_ot"].dtype == "float64"
+
+
+@pytest.mark.parametrize("url", REPORT_URLS)
+def test__reports_identical_with_and_without_compaction(clean_data_dir, monkeypatch: pytest.MonkeyPatch, url: str):
+    """Every report returns the same body from raw and compacted data."""
+    client = TestClient(app)
+    monkeypatch.setenv(data_cleaner.COMPACT_ENV_VAR, "0")
+    reset_data_cache()
+    response_cache.clear()
+    expected = client.get(url).json()
+
+    monkeypatch.setenv(data_cleaner.COMPACT_ENV_VAR, "1")
+    reset_data_cache()
+    response_cache.clear()
+    assert client.get(url).json() == expected
+
+
+def test__dataset_memory_endpoint(clean_data_dir):
+    """The memory report endpoint lists every column with before/after bytes."""
+    body = TestClient(app).get("/dataset/memory").json()
+    columns = {entry["column"] for entry in body["columns"]}
+    assert {"(index)", "employee_id", "department", "total_ot"} <= columns
+    assert body["total_bytes_after"] < body["total_bytes_before"]
+
+
+@pytest.mark.parametrize("compact", ["1", "0"])
+def test__reports_leave_the_cached_frame_untouched(clean_data_dir, monkeypatch: pytest.MonkeyPatch, compact: str):
+    """Reports work on copies: the shared frame keeps its dtypes and values, also without compaction."""
+    monkeypatch.setenv(data_cleaner.COMPACT_ENV_VAR, compact)
+    reset_data_cache()
+    response_cache.clear()
+    cached = data_cleaner.get_cleaned_df()
+    before = cached.copy()
+    client = TestClient(app)
+    for url in REPORT_URLS:
+        assert client.get(url).status_code == 200
+    assert data_cleaner.get_cleaned_df() is cached
+    pd.testing.assert_frame_equal(cached, before)
@@ -0,0 +1,98 @@
+"""Tests for `hr_analysis.overtime_policy`."""
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.hr_analysis.api.main import app
+from src.hr_analysis.overtime_policy import (
+    CONSECUTIVE_DAYS,
+    ROLLING_DAYS,
+    ROLLING_HOURS,
+    OvertimeDays,
+    PolicyRule,
+    evaluate_policies,
+)
+from src.hr_analysis.synthetic_data import make_cleaned_df
+
+
+def _violating_days(df: pd.DataFrame, rule: PolicyRule) -> set:
+    """Brute-force reference: (employee, day) pairs ending a violating window."""
+    flagged = set()
+    ot = df.assign(date=pd.to_datetime(df["date"]))
+    ot = ot[ot["total_ot"] > 0].sort_values(["employee_id", "date"])
+    for employee_id, rows in ot.groupby("employee_id"):
+        dates = list(rows["date"])
+        hours = list(rows["total_ot"])
+        for i, end in enumerate(dates):
+            if rule.kind == CONSECUTIVE_DAYS:
+                length = 1
+                while i - length >= 0 and dates[i - length] == end - pd.Timedelta(days=length):
+                    length += 1
+                hit = length >= rule.limit
+            else:
+                inside = [j for j in range(i + 1) if dates[j] > end - pd.Timedelta(days=rule.window_days)]
+                value = sum(hours[j] for j in inside) if rule.kind == ROLLING_HOURS else len(inside)
+                hit = value > rule.limit
+            if hit:
+                flagged.add((employee_id, end.strftime("%Y-%m-%d")))
+    return flagged
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [PolicyRule(ROLLING_HOURS, 20, 7), PolicyRule(ROLLING_DAYS, 12, 30), PolicyRule(CONSECUTIVE_DAYS, 4)],
+)
+def test__violation_windows_match_brute_force(rule: PolicyRule):
+    """Merged windows cover exactly the days a row-by-row check flags."""
+    df = make_cleaned_df(n_employees=6)
+    violations = evaluate_policies(df, [rule])
+    assert violations
+
+    covered = set()
+    for violation in violations:
+        for day in pd.date_range(violation["window_start"], violation["window_end"]):
+            covered.add((violation["employee_id"], day.strftime("%Y-%m-%d")))
+    expected = _violating_days(df, rule)
+    assert expected <= covered
+    # Every merged window ends on a flagged day
+    assert {(v["employee_id"], v["window_end"]) for v in violations} <= expected
+
+
+def test__streak_and_rolling_rules_on_known_data():
+    df = pd.DataFrame(
+        {
+            "employee_id": ["A1"] * 5 + ["A2"] * 2,
+            "date": ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-05", "2025-01-06", "2025-01-01", "2025-01-02"],
+            "department": ["Finance"] * 5 + ["Marketing"] * 2,
+            "total_ot": [4.0, 5.0, 6.0, 0.0, 9.0, 10.0, 1.0],
+        }
+    )
+    streaks, hours = evaluate_policies(df, [PolicyRule(CONSECUTIVE_DAYS, 3), PolicyRule(ROLLING_HOURS, 14, 3)])
+    assert streaks == {
+        "employee_id": "A1",
+        "department": "Finance",
+        "policy": CONSECUTIVE_DAYS,
+        "window_start": "2025-01-01",
+        "window_end": "2025-01-03",
+        "value": 3.0,
+        "limit": 3.0,
+        "exception_reason": "Overtime on 3 or more consecutive days",
+    }
+    assert (hours["window_start"], hours["window_end"], hours["value"]) == ("2025-01-01", "2025-01-03", 15.0)
+    assert len(OvertimeDays(df)) == 6
+
+
+def test__unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        PolicyRule("weekly", 10)
+
+
+def test__report_returns_policy_violations(clean_data_dir):
+    client = TestClient(app)
+    body = client.get(
+        "/reports/overtime-exceptions",
+        params={"threshold_hours": 6, "rolling_hours_limit": 25, "max_consecutive_days": 4},
+    ).json()
+    assert all(row["overtime_hours"] > 6 for row in body["overtime_exceptions"])
+    assert {v["policy"] for v in body["policy_violations"]} == {ROLLING_HOURS, CONSECUTIVE_DAYS}
@@ -0,0 +1,162 @@
+"""Tests for `hr_analysis.partitions` and partition pruning in the data layer."""
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.hr_analysis import (
+    data_cleaner,
+    partitions,
+)
+from src.hr_analysis.api.main import app
+from src.hr_analysis.api.utils.caching import response_cache
+from tests.fixtures.hr_data import (
+    make_cleaned_df,
+    reset_data_cache,
+)
+
+REPORT_URLS = [
+    "/reports/department-overtime?start_date=2025-02-10&end_date=2025-03-05",
+    "/reports/overtime-trends?granularity=weekly&start_date=2025-01-20",
+    "/reports/overtime-month-comparison",
+    "/reports/top-overtime-employees?end_date=2025-01-31",
+    "/reports/overtime-weekly-summary?start_date=2025-03-01",
+    "/reports/attendance/all",
+    "/reports/attendance?department=Finance&start_date=2025-01-20&end_date=2025-02-10",
+    "/reports/overtime-exceptions?threshold_hours=6",
+]
+
+
+@pytest.fixture
+def partitioned_dir(clean_data_dir):
+    """The synthetic dataset rewritten as monthly partitions."""
+    cleaned_path = clean_data_dir / data_cleaner.CLEANED_CSV_NAME
+    partitions.write_partitions(clean_data_dir, pd.read_csv(cleaned_path, index_col=0))
+    cleaned_path.unlink()
+    reset_data_cache()
+    response_cache.clear()
+    return clean_data_dir
+
+
+def test__clean_all_csvs_writes_monthly_partitions(clean_data_dir):
+    """partition_by_month writes one file per month and a catalog with dates and row counts."""
+    data_cleaner.UNCLEAN_DATA_DIR.mkdir()
+    (data_cleaner.UNCLEAN_DATA_DIR / "a.csv").write_text(
+        "employee_id,date,total_ot\nA1,2025-06-30,1\nA1,2025-07-01,2\nA2,2025-07-15,3\nA3,not a date,4\n"
+    )
+    data_cleaner.clean_all_csvs(partition_by_month=True)
+
+    assert not (clean_data_dir / data_cleaner.CLEANED_CSV_NAME).exists()
+    catalog = {entry["name"]: entry for entry in partitions.read_catalog(clean_data_dir)}
+    assert set(catalog) == {"2025-06", "2025-07", partitions.UNKNOWN_PARTITION}
+    assert catalog["2025-07"]["min_date"] == "2025-07-01"
+    assert catalog["2025-07"]["max_date"] == "2025-07-15"
+    assert catalog["2025-07"]["rows"] == 2
+    assert len(data_cleaner.read_cleaned_store()) == 4
+    assert not data_cleaner.is_clean_data_stale()
+
+
+def test__date_range_loads_only_overlapping_partitions(partitioned_dir):
+    """A one-month query neither reads nor returns rows of other months."""
+    df = data_cleaner.get_cleaned_df("2025-02-01", "2025-02-28")
+    assert set(data_cleaner._partition_frames) == {"2025-02"}
+    assert df["date"].dt.month.unique().tolist() == [2]
+
+    everything = data_cleaner.get_cleaned_df()
+    assert set(data_cleaner._partition_frames) == {"2025-01", "2025-02", "2025-03"}
+    assert len(everything) == 12 * 90
+
+
+@pytest.mark.parametrize("url", REPORT_URLS)
+def test__partitioned_reports_match_monolithic(clean_data_dir, url: str):
+    """Reports return the same body from the partitioned and the single-file store."""
+    client = TestClient(app)
+    response_cache.clear()
+    expected = client.get(url).json()
+
+    cleaned_path = clean_data_dir / data_cleaner.CLEANED_CSV_NAME
+    partitions.write_partitions(clean_data_dir, pd.read_csv(cleaned_path, index_col=0))
+    cleaned_path.unlink()
+    reset_data_cache()
+    response_cache.clear()
+    assert client.get(url).json() == expected
+
+
+def test__ingest_and_compaction_touch_only_affected_months(partitioned_dir):
+    """Deltas show up in pruned queries and compaction rewrites only their month."""
+    client = TestClient(app)
+    january = partitions.partition_dir(partitioned_dir) / "month=2025-01.csv"
+    january_mtime = january.stat().st_mtime_ns
+    client.post("/dataset/ingest", content=b"employee_id,date,department,total_ot\nA10001,2025-04-02,Engineering,5\n")
+
+    df = data_cleaner.get_cleaned_df("2025-04-01", "2025-04-30")
+    assert df["employee_id"].astype(str).tolist() == ["A10001"]
+    assert "2025-01" not in data_cleaner._partition_frames
+
+    assert data_cleaner.compact_delta_log() == 1
+    catalog = {entry["name"]: entry for entry in partitions.read_catalog(partitioned_dir)}
+    assert catalog["2025-04"]["rows"] == 1
+    assert january.stat().st_mtime_ns == january_mtime
+
+
+def _store_with_deltas(clean_data_dir, client: TestClient, partitioned: bool) -> list:
+    """All attendance rows after two ingests (one replacing a base row) and a compaction, then one more ingest."""
+    cleaned_path = clean_data_dir / data_cleaner.CLEANED_CSV_NAME
+    if partitioned:
+        partitions.write_partitions(clean_data_dir, pd.read_csv(cleaned_path, index_col=0))
+        cleaned_path.unlink()
+    reset_data_cache()
+    header = b"employee_id,date,department,total_ot\n"
+    batches = [
+        b"A10003,2025-01-05,Marketing,7\nA10001,2025-04-02,Engineering,5\n",
+        b"A10002,2025-02-11,Finance,3\n",
+        b"A10004,2025-03-01,Human Resource,1\nA10009,2025-01-02,Finance,2\n",
+    ]
+    for batch in batches[:2]:
+        client.post("/dataset/ingest", content=header + batch)
+    assert data_cleaner.compact_delta_log() == 2
+    client.post("/dataset/ingest", content=header + batches[2])
+    response_cache.clear()
+    return client.get("/reports/attendance/all").json()["attendance"]
+
+
+def test__partitioned_rows_keep_cleaned_order_through_ingest_and_compaction(tmp_path, monkeypatch):
+    """Composed partitions list rows in the order the single-file store has them, deltas included."""
+    client = TestClient(app)
+    bodies = []
+    for partitioned in (False, True):
+        clean_dir = tmp_path / f"partitioned={partitioned}"
+        clean_dir.mkdir()
+        make_cleaned_df().to_csv(clean_dir / data_cleaner.CLEANED_CSV_NAME)
+        monkeypatch.setattr(data_cleaner, "CLEAN_DATA_DIR", clean_dir)
+        bodies.append(_store_with_deltas(clean_dir, client, partitioned))
+    assert bodies[1] == bodies[0]
+    assert bodies[0][-1]["employee_id"] == "A10009"
+    reset_data_cache()
+    monolithic = pd.read_csv(tmp_path / "partitioned=False" / data_cleaner.CLEANED_CSV_NAME, index_col=0)
+    pd.testing.assert_frame_equal(data_cleaner.read_cleaned_store(), monolithic)
+
+
+def test__clean_all_csvs_keeps_partitioned_layout_unless_switched_off(clean_data_dir, monkeypatch):
+    """A rebuild without an explicit layout keeps the partitions; only an explicit switch reverts them."""
+    data_cleaner.UNCLEAN_DATA_DIR.mkdir()
+    (data_cleaner.UNCLEAN_DATA_DIR / "a.csv").write_text("employee_id,date,total_ot\nA1,2025-06-30,1\n")
+    monkeypatch.delenv(data_cleaner.PARTITION_ENV_VAR, raising=False)
+    data_cleaner.clean_all_csvs(partition_by_month=True)
+    assert not data_cleaner.is_clean_data_stale()
+
+    data_cleaner.clean_all_csvs()
+    assert partitions.read_catalog(clean_data_dir) is not None
+    assert not (clean_data_dir / data_cleaner.CLEANED_CSV_NAME).exists()
+
+    # Asking for the other layout makes the store stale, so production re-cleans
+    assert data_cleaner.is_clean_data_stale(partition_by_month=False)
+    monkeypatch.setenv(data_cleaner.PARTITION_ENV_VAR, "0")
+    assert data_cleaner.is_clean_data_stale()
+    data_cleaner.clean_all_csvs()
+    assert partitions.read_catalog(clean_data_dir) is None
+    assert (clean_data_dir / data_cleaner.CLEANED_CSV_NAME).exists()
+
+    monkeypatch.setenv(data_cleaner.PARTITION_ENV_VAR, "1")
+    data_cleaner.clean_all_csvs()
+    assert partitions.read_catalog(clean_data_dir) is not None
@@ -0,0 +1,89 @@
+"""Tests for `hr_analysis.api.utils.push` and the /events endpoint."""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from src.hr_analysis.api.main import app
+from src.hr_analysis.api.utils import caching
+from src.hr_analysis.api.utils.push import (
+    PushHub,
+    Subscriber,
+    format_event,
+)
+
+
+def _data(event: str) -> dict:
+    return json.loads("".join(line[len("data: "):] for line in event.splitlines() if line.startswith("data: ")))
+
+
+def test__each_subscription_is_computed_once_per_change(clean_data_dir):
+    """Identical subscriptions share one computation; version-only ones compute nothing."""
+    caching.response_cache.clear()
+
+    async def scenario():
+        hub = PushHub()
+        path, query = "/reports/department-overtime", "start_date=2025-02-01"
+        first = await hub.subscribe(app, path, query, True)
+        second = await hub.subscribe(app, path, query, True)
+        version_only = await hub.subscribe(app, path, "", False)
+        assert _data(first[2])["result"] == _data(second[2])["result"]
+        assert "result" not in _data(version_only[2])
+
+        computed = hub.computations
+        await hub.publish("next-version")
+        events = [subscriber.queue.get_nowait() for _, subscriber, _ in (first, second, version_only)]
+        await hub.close()
+        return hub, computed, events
+
+    hub, computed, events = asyncio.run(scenario())
+    assert hub.computations == computed + 1
+    assert events[0] == events[1]
+    assert _data(events[0])["status"] == 200
+    assert _data(events[0])["dataset_version"] == "next-version"
+    assert _data(events[2]) == {"dataset_version": "next-version", "path": "/reports/department-overtime", "query": ""}
+    assert hub.stats()["events_sent"] == 3
+
+
+def test__reconnect_with_current_version_skips_first_event(clean_data_dir):
+    async def scenario():
+        hub = PushHub()
+        _, _, event = await hub.subscribe(app, "/dashboard", "", True)
+        version = event.split("id: ")[1].split("\n")[0]
+        reconnected = await hub.subscribe(app, "/dashboard", "", True, last_event_id=version)
+        await hub.close()
+        return reconnected[2]
+
+    assert asyncio.run(scenario()) is None
+
+
+def test__slow_subscriber_keeps_only_latest_event():
+    async def scenario():
+        subscriber = Subscriber()
+        subscriber.offer("old")
+        subscriber.offer("new")
+        return subscriber.queue.qsize(), subscriber.queue.get_nowait()
+
+    assert asyncio.run(scenario()) == (1, "new")
+
+
+def test__unsubscribing_last_client_drops_subscription(clean_data_dir):
+    async def scenario():
+        hub = PushHub()
+        subscription, subscriber, _ = await hub.subscribe(app, "/reports/departments", "", False)
+        hub.unsubscribe(subscription, subscriber)
+        await hub.close()
+        return hub.stats()
+
+    assert asyncio.run(scenario())["subscriptions"] == 0
+
+
+def test__events_rejects_paths_that_are_not_reports(clean_data_dir):
+    client = TestClient(app)
+    assert client.get("/events", params={"path": "/dataset/memory"}).status_code == 404
+    assert client.get("/events", params={"path": "/reports/no-such-report"}).status_code == 404
+
+
+def test__multiline_data_is_split_into_data_lines():
+    assert format_event("update", "a\nb", "v1") == "event: update\nid: v1\ndata: a\ndata: b\n\n"
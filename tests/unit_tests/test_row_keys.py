@@ -0,0 +1,79 @@
+"""Tests for `hr_analysis.row_keys` and key-based dedup in the cleaner."""
+
+import numpy as np
+import pandas as pd
+
+from src.hr_analysis.data_cleaner import (
+    clean_frame,
+    merge_cleaned_frames,
+)
+from src.hr_analysis.row_keys import (
+    employee_date_keys,
+    employee_day_keys,
+    string_codes,
+)
+
+
+def test__codes_follow_string_equality():
+    """Values with the same str() share a code, across columns and dtypes."""
+    (raw, strings), distinct = string_codes(
+        pd.Series([101, 102.0, np.nan], dtype=object), pd.Series(["101", "nan", "102"])
+    )
+    assert raw[0] == strings[0]
+    assert raw[2] == strings[1]
+    assert strings[2] not in raw
+    assert distinct == 4
+
+
+def test__employee_date_keys_identify_pairs():
+    keys = employee_date_keys(
+        [pd.Series(["A1", "A1", "A2", "A1"])],
+        [pd.Series(pd.to_datetime(["2025-01-01", "2025-01-02", "2025-01-01", "2025-01-01"]))],
+    )
+    assert keys.dtype == np.int64
+    assert keys[0] == keys[3]
+    assert len(set(keys[:3])) == 3
+
+
+def test__employee_day_keys_are_comparable():
+    existing, newer = employee_day_keys(
+        pd.Series(pd.Categorical(["A1", "A2"])), np.array([5, -1], dtype=np.int32),
+        pd.Series(["A2", "A1"]), np.array([-1, 5], dtype=np.int32),
+    )
+    assert existing[0] == newer[1]
+    assert existing[1] == newer[0]
+
+
+def test__merge_keeps_first_row_per_employee_and_date():
+    first = clean_frame(
+        pd.DataFrame({"Employee ID": ["A1 ", "A2"], "Date": ["2025-01-01", "2025-01-01"], "OT": [1, 2]})
+    )
+    second = clean_frame(pd.DataFrame({"emp_code": ["A1", "A3"], "day": ["01/01/2025", "02/01/2025"], "OT": [9, 3]}))
+    merged = merge_cleaned_frames([first, second])
+    assert list(merged.index) == ["A1_2025-01-01", "A2_2025-01-01", "A3_2025-01-02"]
+    assert merged.index.name == "employee_date_id"
+    assert list(merged["ot"]) == [1, 2, 3]
+
+
+def test__ids_are_compared_per_source_dtype():
+    """An int 101 and a float 101.0 (column with a NaN) are different IDs, as their strings are."""
+    first = pd.DataFrame({"employee_id": [101], "date": ["2025-01-01"], "ot": [1]})
+    second = pd.DataFrame({"employee_id": [101.0, np.nan], "date": ["2025-01-01", "2025-01-01"], "ot": [2, 3]})
+    merged = merge_cleaned_frames([first, second])
+    assert list(merged["ot"]) == [1, 2, 3]
+    assert list(merged.index) == ["101.0_2025-01-01", "101.0_2025-01-01", "nan_2025-01-01"]
+
+
+def test__dates_are_compared_as_rendered_per_source():
+    """A parsed datetime64 date and a Timestamp in a mixed column render differently, so both rows are kept."""
+    parsed = pd.DataFrame({"employee_id": ["A1"], "date": pd.to_datetime(["2025-01-01"])})
+    mixed = pd.DataFrame({"employee_id": ["A1", "A1"], "date": pd.Series([pd.Timestamp("2025-01-01"), "garbage"])})
+    (parsed_codes, mixed_codes), _ = string_codes(parsed["date"], mixed["date"])
+    assert parsed_codes[0] != mixed_codes[0]
+    assert len(merge_cleaned_frames([parsed, mixed])) == 3
+
+
+def test__rows_without_employee_or_date_are_all_kept():
+    frames = [clean_frame(pd.DataFrame({"foo": [1, 1]})), clean_frame(pd.DataFrame({"foo": [2]}))]
+    merged = merge_cleaned_frames(frames)
+    assert list(merged.index) == ["unidentified_0_0", "unidentified_0_1", "unidentified_1_0"]
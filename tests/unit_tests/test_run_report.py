@@ -0,0 +1,67 @@
+"""Tests for `hr_analysis.run_report` and the run report of clean_all_csvs()."""
+
+import json
+
+from src.hr_analysis import (
+    data_cleaner,
+    run_report,
+)
+
+FILE_STAGES = {run_report.READ, run_report.NORMALIZE_COLUMNS, run_report.STRIP, run_report.PARSE_DATES}
+MERGE_STAGES = {
+    run_report.CONCAT,
+    run_report.DEDUP,
+    run_report.DROP_DUPLICATE_COLUMNS,
+    run_report.REPLAY_INGESTED,
+    run_report.WRITE,
+}
+
+
+def _write_sources() -> None:
+    data_cleaner.UNCLEAN_DATA_DIR.mkdir()
+    (data_cleaner.UNCLEAN_DATA_DIR / "a.csv").write_text(
+        "Employee ID,Date,total_ot\nA1 ,2025-07-01,1\nA2,2025-07-02,2\nA3,2025-07-03,3\n"
+    )
+    (data_cleaner.UNCLEAN_DATA_DIR / "b.csv").write_text("emp_code,day,total_ot\nA1,2025-07-01,1\nA4,2025-07-04,4\n")
+
+
+def test__clean_all_csvs_writes_run_report(clean_data_dir):
+    _write_sources()
+    report = data_cleaner.clean_all_csvs(trace_memory=True)
+
+    assert json.loads((clean_data_dir / run_report.REPORT_NAME).read_text()) == report
+    assert report["counts"] == {
+        "rows_before_dedup": 5,
+        "columns_before_dedup": 3,
+        "rows_after_dedup": 4,
+        "columns_after_dedup": 3,
+    }
+    assert set(report["stage_totals"]) == FILE_STAGES | MERGE_STAGES
+    assert set(report["files"]) == {"a.csv", "b.csv"}
+    assert set(report["files"]["a.csv"]["stages"]) == FILE_STAGES
+    assert report["files"]["a.csv"]["rows"] == 3
+    assert all(entry["peak_traced_bytes"] > 0 for entry in report["stages"])
+    assert report["profile"] is None
+    assert report["output"] == str(clean_data_dir / data_cleaner.CLEANED_CSV_NAME)
+
+
+def test__runs_are_appended_to_history_and_profile_is_optional(clean_data_dir):
+    _write_sources()
+    data_cleaner.clean_all_csvs()
+    report = data_cleaner.clean_all_csvs(profile=True)
+    assert report["memory_traced"] is False
+    assert all(entry["peak_traced_bytes"] is None and entry["max_rss_bytes"] for entry in report["stages"])
+
+    history = (clean_data_dir / run_report.HISTORY_NAME).read_text().splitlines()
+    assert len(history) == 2
+    assert set(json.loads(history[0])["file_seconds"]) == {"a.csv", "b.csv"}
+    assert (clean_data_dir / run_report.PROFILE_NAME).exists()
+    assert report["profile"] == str(clean_data_dir / run_report.PROFILE_NAME)
+
+
+def test__disabled_profiler_records_nothing():
+    profiler = run_report.RunProfiler(enabled=False)
+    with profiler.stage(run_report.READ, "a.csv"):
+        pass
+    profiler.count("rows_after_dedup", 3)
+    assert profiler.stages == [] and profiler.counts == {}
@@ -0,0 +1,140 @@
+"""Tests for `hr_analysis.api.utils.single_flight`."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.hr_analysis.api.endpoints import report
+from src.hr_analysis.api.main import app
+from src.hr_analysis.api.utils import (
+    caching,
+    single_flight,
+)
+
+
+@pytest.fixture
+def flights(monkeypatch: pytest.MonkeyPatch) -> single_flight.SingleFlight:
+    state = single_flight.SingleFlight()
+    monkeypatch.setattr(caching, "report_flights", state)
+    monkeypatch.setattr("src.hr_analysis.api.endpoints.dataset.report_flights", state)
+    caching.response_cache.clear()
+    yield state
+    caching.response_cache.clear()
+
+
+async def _get_all(requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get(path, params=params) for path, params in requests))
+
+
+def test__identical_concurrent_requests_compute_once(clean_data_dir, flights, monkeypatch: pytest.MonkeyPatch):
+    """Ten identical requests in flight together run the report once and get the same body."""
+    calls = []
+    load = report.get_cleaned_df
+
+    def slow_load(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.2)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(report, "get_cleaned_df", slow_load)
+    params = {"start_date": "2025-02-01"}
+    responses = asyncio.run(_get_all([("/reports/department-overtime", params)] * 10))
+
+    assert [r.status_code for r in responses] == [200] * 10
+    assert len({r.content for r in responses}) == 1
+    assert len(calls) == 1
+    assert flights.stats() == {"computations": 1, "coalesced_requests": 9, "in_flight": 0, "waiting_requests": 0}
+
+
+def test__different_params_are_not_coalesced(clean_data_dir, flights):
+    responses = asyncio.run(
+        _get_all([("/reports/department-overtime", {"start_date": day}) for day in ("2025-01-01", "2025-02-01")])
+    )
+    assert [r.status_code for r in responses] == [200, 200]
+    assert flights.stats()["computations"] == 2
+    assert flights.stats()["coalesced_requests"] == 0
+
+
+def test__failure_is_retried_once_and_not_kept():
+    """Waiters retry a failed computation once (together), then see the error; the next call computes again."""
+    flights = single_flight.SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.run("k", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flights.run("k", failing)
+
+    asyncio.run(scenario())
+    # Leader, one shared retry of the two waiters, the later call
+    assert len(attempts) == 3
+    assert flights.stats()["coalesced_requests"] == 3
+
+
+def test__waiters_survive_the_leader_being_cancelled():
+    """A leader whose client disconnects takes its computation down; waiters recompute instead of failing."""
+    flights = single_flight.SingleFlight()
+
+    async def scenario():
+        leader_gone = asyncio.Event()
+
+        async def leader_compute():
+            # Like call_next() of a disconnected request: fails once its own caller is gone
+            await leader_gone.wait()
+            raise RuntimeError("No response returned.")
+
+        async def own_compute():
+            return "body"
+
+        leader = asyncio.ensure_future(flights.run("k", leader_compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(flights.run("k", own_compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        leader_gone.set()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    assert asyncio.run(scenario()) == ["body"] * 3
+    assert flights.stats()["computations"] == 2
+    assert flights.stats()["waiting_requests"] == 0
+
+
+def test__waiting_requests_succeed_when_leader_disconnects(clean_data_dir, flights, monkeypatch: pytest.MonkeyPatch):
+    """Identical requests waiting on a cancelled request get a 200 rather than its failure."""
+    load = report.get_cleaned_df
+
+    def slow_load(*args, **kwargs):
+        time.sleep(0.3)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(report, "get_cleaned_df", slow_load)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            params = {"start_date": "2025-02-01"}
+            leader = asyncio.ensure_future(client.get("/reports/department-overtime", params=params))
+            await asyncio.sleep(0.05)
+            waiters = [
+                asyncio.ensure_future(client.get("/reports/department-overtime", params=params)) for _ in range(3)
+            ]
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            return await asyncio.gather(*waiters)
+
+    responses = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [200] * 3
+    assert len({r.content for r in responses}) == 1
@@ -0,0 +1,77 @@
+"""Parity tests: the DuckDB backend must answer every report exactly like pandas."""
+
+import pytest
+
+from src.hr_analysis import (
+    data_cleaner,
+    sql_backend,
+)
+from src.hr_analysis.api.endpoints import report
+from src.hr_analysis.synthetic_data import make_cleaned_df
+
+pytest.importorskip("duckdb")
+
+FILTERS = [
+    {},
+    {"start_date": "2025-02-01", "end_date": "2025-02-28"},
+    {"start_date": "2025-01-15"},
+    {"end_date": "2025-03-10"},
+]
+REPORTS = [
+    (report.department_overtime, {}),
+    (report.overtime_department_comparison, {}),
+    (report.overtime_employee_comparison, {"employee_ids": None}),
+    (report.overtime_employee_comparison, {"employee_ids": ["A10002", "A10005"]}),
+    (report.top_overtime_employees, {"department": None, "top_n": 5}),
+    (report.top_overtime_employees, {"department": "FINANCE", "top_n": 10}),
+    (report.overtime_month_comparison, {"department": None, "employee_id": None}),
+    (report.overtime_month_comparison, {"department": "engineering", "employee_id": "A10001"}),
+    (report.overtime_trends, {"department": None, "employee_id": None, "granularity": "daily"}),
+    (report.overtime_trends, {"department": "Marketing", "employee_id": None, "granularity": "weekly"}),
+    (report.overtime_trends, {"department": None, "employee_id": "A10003", "granularity": "monthly"}),
+]
+
+
+@pytest.fixture(params=[False, True], ids=["whole_hours", "fractional_hours"])
+def hr_data_dir(request, clean_data_dir):
+    """The synthetic store with whole or fractional overtime hours; float sums must agree bit for bit."""
+    make_cleaned_df(fractional=request.param).to_csv(clean_data_dir / data_cleaner.CLEANED_CSV_NAME)
+    data_cleaner.reset_cache()
+    return clean_data_dir
+
+
+def _run(monkeypatch: pytest.MonkeyPatch, backend: str, function, kwargs):
+    monkeypatch.setenv(sql_backend.BACKEND_ENV_VAR, backend)
+    data_cleaner.reset_cache()
+    return function(**kwargs)
+
+
+@pytest.mark.parametrize("compact", ["1", "0"])
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("function,params", REPORTS)
+def test__duckdb_matches_pandas(hr_data_dir, monkeypatch: pytest.MonkeyPatch, compact, filters, function, params):
+    monkeypatch.setenv(data_cleaner.COMPACT_ENV_VAR, compact)
+    kwargs = {"start_date": None, "end_date": None, **params, **filters}
+    expected = _run(monkeypatch, sql_backend.PANDAS_BACKEND, function, kwargs)
+    assert _run(monkeypatch, sql_backend.DUCKDB_BACKEND, function, kwargs) == expected
+
+
+def test__duckdb_matches_pandas_with_deltas_and_partitions(clean_data_dir, monkeypatch: pytest.MonkeyPatch):
+    """Pending delta segments and month partitions are seen the same way by both backends."""
+    data_cleaner.UNCLEAN_DATA_DIR.mkdir()
+    source = make_cleaned_df(fractional=True).reset_index(drop=True)
+    source.to_csv(data_cleaner.UNCLEAN_DATA_DIR / "attendance.csv", index=False)
+    data_cleaner.clean_all_csvs(partition_by_month=True)
+    batch = make_cleaned_df(n_employees=3, start="2025-02-20", end="2025-04-05", seed=11, fractional=True)
+    batch = batch.reset_index(drop=True)
+    data_cleaner.ingest_batch(batch)
+    for function, params in REPORTS:
+        kwargs = {"start_date": "2025-02-15", "end_date": None, **params}
+        expected = _run(monkeypatch, sql_backend.PANDAS_BACKEND, function, kwargs)
+        assert _run(monkeypatch, sql_backend.DUCKDB_BACKEND, function, kwargs) == expected
+
+
+def test__unknown_backend_is_rejected(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv(sql_backend.BACKEND_ENV_VAR, "spark")
+    with pytest.raises(ValueError):
+        sql_backend.sql_backend_enabled()
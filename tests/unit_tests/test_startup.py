@@ -0,0 +1,86 @@
+"""Tests for `hr_analysis.api.startup` and the readiness probe."""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.hr_analysis import data_cleaner
+from src.hr_analysis.api import startup
+from src.hr_analysis.api.main import app
+from src.hr_analysis.api.utils import caching
+
+
+@pytest.fixture
+def fresh_readiness(monkeypatch: pytest.MonkeyPatch) -> startup.ReadinessState:
+    state = startup.ReadinessState()
+    monkeypatch.setattr(startup, "readiness", state)
+    monkeypatch.setattr("src.hr_analysis.api.main.readiness", state)
+    return state
+
+
+def test__ready_is_503_until_startup_ran(fresh_readiness):
+    """Liveness answers immediately while readiness waits for the lifespan startup."""
+    client = TestClient(app)
+    assert client.get("/").status_code == 200
+    assert client.get("/ready").status_code == 503
+
+
+def test__warm_up_loads_dataset_before_ready(clean_data_dir, fresh_readiness, monkeypatch: pytest.MonkeyPatch):
+    """With warm-up enabled the dataset is cached and time-to-ready is reported."""
+    monkeypatch.setenv(startup.WARMUP_ENV_VAR, "1")
+    with TestClient(app) as client:
+        assert data_cleaner._partition_frames
+        body = client.get("/ready").json()
+    assert body["status"] == "ready"
+    assert body["time_to_ready_seconds"] >= 0
+    assert body["dataset_version"] == data_cleaner.get_dataset_version()
+
+
+def test__warm_up_without_data_stays_not_ready(tmp_path, fresh_readiness, monkeypatch: pytest.MonkeyPatch):
+    """A missing cleaned store keeps /ready at 503 instead of crashing startup."""
+    monkeypatch.setattr(data_cleaner, "CLEAN_DATA_DIR", tmp_path)
+    monkeypatch.setenv(startup.WARMUP_ENV_VAR, "1")
+    with TestClient(app) as client:
+        response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["error"]
+
+
+def test__warm_up_fills_the_response_cache(clean_data_dir, fresh_readiness, monkeypatch: pytest.MonkeyPatch):
+    """Warm-up goes through the app, so the first real request is served from the response cache."""
+    monkeypatch.setenv(startup.WARMUP_ENV_VAR, "1")
+    caching.response_cache.clear()
+    with TestClient(app) as client:
+        assert len(caching.response_cache) == len(startup.WARMUP_REQUESTS)
+        leaders = caching.report_flights.leaders
+        assert client.get("/reports/top-overtime-employees?top_n=10").status_code == 200
+        assert caching.report_flights.leaders == leaders
+
+
+def test__unreadable_data_stays_not_ready(clean_data_dir, fresh_readiness, monkeypatch: pytest.MonkeyPatch):
+    """Any failure to load the dataset, not just a missing file, keeps the app alive but not ready."""
+    corrupt = "employee_date_id,date\nA1_2025-01-01,2025-01-01,x,y\n"
+    (clean_data_dir / data_cleaner.CLEANED_CSV_NAME).write_text(corrupt)
+    data_cleaner.reset_cache()
+    monkeypatch.setenv(startup.WARMUP_ENV_VAR, "1")
+    with TestClient(app) as client:
+        assert client.get("/").status_code == 200
+        response = client.get("/ready")
+    assert response.status_code == 503
+    assert "ParserError" in response.json()["error"]
+
+
+def test__is_clean_data_stale(clean_data_dir):
+    """Cleaning is only needed when an input CSV is newer than cleaned.csv."""
+    unclean_dir = data_cleaner.UNCLEAN_DATA_DIR
+    unclean_dir.mkdir()
+    source = unclean_dir / "attendance.csv"
+    source.write_text("employee_id,date\n")
+    cleaned_mtime = (clean_data_dir / data_cleaner.CLEANED_CSV_NAME).stat().st_mtime_ns
+
+    os.utime(source, ns=(cleaned_mtime - 10**9, cleaned_mtime - 10**9))
+    assert not data_cleaner.is_clean_data_stale()
+
+    os.utime(source, ns=(cleaned_mtime + 10**9, cleaned_mtime + 10**9))
+    assert data_cleaner.is_clean_data_stale()